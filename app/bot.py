@@ -5,6 +5,9 @@ from dotenv import load_dotenv
 
 load_dotenv()
 intents = discord.Intents.default()
+# 国旗リアクション翻訳を使う場合のみメッセージ本文を取得（特権インテント）
+if os.getenv("TRANSLATE_REACTIONS", "").lower() in ("1", "true", "yes"):
+    intents.message_content = True
 
 class MultiFeatureBot(commands.Bot):
     def __init__(self):
@@ -13,6 +13,8 @@ class GeneralHelp(commands.Cog):
             "**🎮 スプラトゥーン機能**\n"
             "• `/splatoon_help` - スプラトゥーン機能のヘルプ\n"
             "• `/splatoon_team` - チーム編成\n"
+            "• `/splatoon_lobbies` - 複数ロビーの一括編成\n"
+            "• `/splatoon_team_replay` - 編成結果の再表示\n"
             "• `/splatoon_weapon` - ブキ情報検索\n\n"
             "**📅 カレンダー機能** ⚠️ 実装予定\n"
             "• Google Calendar連携の設定完了後に利用可能になります\n"
@@ -25,6 +27,9 @@ class GeneralHelp(commands.Cog):
             "• `/qr` - QRコード生成\n\n"
             "**🌐 翻訳機能**\n"
             "• `/translate` - テキスト翻訳 (ja, en, zh-CN, zh-TW, ko, fr, de, es)\n"
+            "• `/translate_all` - 全対応言語へ一括翻訳\n"
+            "• メッセージのメニュー「Translate to…」から翻訳\n"
+            "• `/translate_stats` - 翻訳の処理時間などの統計（管理者用）\n"
             "• 言語選択肢と直接入力の両方に対応\n"
             "• 詳細表示時はコピー用テキストも提供\n"
             "• `/translate_help` - 翻訳機能のヘルプ\n\n"
@@ -32,9 +37,11 @@ class GeneralHelp(commands.Cog):
             "• `/remind_help` - リマインダー機能のヘルプ\n"
             "• `/remind` - 相対時間リマインダー (例: 5m, 1h)\n"
             "• `/remind_at` - 絶対時間リマインダー (例: 明日 9:00)\n"
+            "• `/remind_every` - 繰り返しリマインダー (例: 平日 9:30)\n"
             "• `/remind_list` - リマインダー一覧表示\n"
             "• `/remind_delete` - リマインダー削除\n"
             "• `/remind_clear` - 全リマインダー削除\n"
+            "• `/remind_stats` - 配信統計（管理者用）\n"
             "• スレッド参加者メンション・永続化対応\n\n"
             "**🔧 ユーティリティ機能**\n"
             "• `/ping` - Bot応答確認\n\n"
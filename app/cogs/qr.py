@@ -1,17 +1,30 @@
+import os
 import discord
 from discord.ext import commands
 from discord import app_commands
 import qrcode
 from io import BytesIO
 from datetime import datetime
+from app.services.rate_limiter import RateLimiter
 
 class QRCodeGenerator(commands.Cog):
+    # 1ユーザーあたりの1分間の上限（0 は無制限）
+    RATE_PER_MINUTE = int(os.getenv("QR_RATE_PER_MINUTE", "0"))
+
     def __init__(self, bot):
         self.bot = bot
+        self.rate_limiter = (
+            RateLimiter({'per_minute': (self.RATE_PER_MINUTE, 60)}) if self.RATE_PER_MINUTE > 0 else None
+        )
 
     @app_commands.command(name="qr", description="テキストやURLをQRコードに変換します")
     @app_commands.describe(text="QRコードに変換するテキストまたはURL")
     async def generate_qr(self, interaction: discord.Interaction, text: str):
+        if self.rate_limiter and self.rate_limiter.try_acquire(interaction.user.id):
+            await interaction.response.send_message(
+                f"🚫 1分間の制限に達しました ({self.RATE_PER_MINUTE}回/分)", ephemeral=True
+            )
+            return
         try:
             # QRコードを生成
             qr = qrcode.QRCode(
@@ -2,100 +2,231 @@ import discord
 from discord.ext import commands, tasks
 from discord import app_commands
 import asyncio
-import re
-import json
 import os
+import socket
+import time
 import uuid
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, time as dt_time
 from typing import Optional, Dict, List, Set
+from app.services.reminder_model import Reminder, shard_of, to_epoch
+from app.services.reminder_scheduler import ReminderScheduler
+from app.services.recurrence import parse_recurrence, parse_recurrence_rule
+from app.services.time_parser import parse_duration, parse_datetime
+from app.services.reminder_delivery import ReminderCatchUp, ReminderDelivery
+from app.services.thread_participant_cache import ThreadParticipantCache
+from app.services.reminder_store import ReminderStore, create_reminder_store
 
 class ReminderManager:
-    def __init__(self, file_path: str = "data/reminders.json"):
-        self.file_path = file_path
-        self.ensure_data_dir()
-    
-    def ensure_data_dir(self):
-        """データディレクトリとファイルの存在を確認"""
-        os.makedirs("data", exist_ok=True)
-        if not os.path.exists(self.file_path):
-            self.save_reminders([])
-    
-    def load_reminders(self) -> List[Dict]:
-        """リマインダーデータを読み込み"""
-        try:
-            with open(self.file_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                return data.get("reminders", [])
-        except Exception as e:
-            print(f"リマインダー読み込みエラー: {e}")
-            return []
+    LEASE_TTL = 30  # シャードのリース有効期間（秒）
+    LEASE_RENEW_INTERVAL = 10  # リース更新・他プロセス追加分の取り込み間隔（秒）
     
-    def save_reminders(self, reminders: List[Dict]):
-        """リマインダーデータを保存"""
-        try:
-            data = {"reminders": reminders}
-            with open(self.file_path, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            print(f"リマインダー保存エラー: {e}")
+    def __init__(self, store: ReminderStore = None, shard_count: int = None):
+        self.store = store or create_reminder_store()
+        # リマインダーは起動時に一度だけ読み込み、以降はメモリ上で管理
+        self.reminders: Dict[str, Reminder] = {}
+        self.user_index: Dict[int, Set[str]] = {}  # user_id -> リマインダーID
+        self.scheduler = ReminderScheduler()
+        # スケジューラから取り出し済みで、配信後の後処理（再登録・削除）がまだのもの
+        self.in_flight: Set[str] = set()
+        
+        # 複数プロセス稼働時はギルド単位のシャードをリースで分担
+        if shard_count is None:
+            shard_count = int(os.getenv("REMINDER_SHARD_COUNT", "1"))
+        if shard_count > 1 and not self.store.supports_leases:
+            print("⚠️ REMINDER_SHARD_COUNT には REMINDER_STORE=sqlite が必要です（単一プロセスとして動作）")
+            shard_count = 1
+        self.shard_count = shard_count
+        self.sharded = shard_count > 1
+        # インデックスで期限の近い分だけを読み込めるストアでは、全件をメモリに載せない
+        self.windowed = self.store.supports_due_query
+        self.owner_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.owned_shards: Set[int] = set()
+        
+        if self.sharded:
+            self.refresh_ownership()
+        elif self.windowed:
+            self.load_window()
+        else:
+            for reminder in self.store.load_all():
+                self._register(reminder)
+    
+    def _register(self, reminder: Reminder):
+        """メモリ上のテーブルとスケジューラに登録"""
+        self.reminders[reminder.id] = reminder
+        self.user_index.setdefault(reminder.user_id, set()).add(reminder.id)
+        self.scheduler.push(reminder.id, reminder.target_ts)
+    
+    def _unregister(self, reminder_id: str) -> bool:
+        """メモリ上のテーブルとスケジューラから削除"""
+        reminder = self.reminders.pop(reminder_id, None)
+        if reminder is None:
+            return False
+        user_ids = self.user_index.get(reminder.user_id)
+        if user_ids is not None:
+            user_ids.discard(reminder_id)
+            if not user_ids:
+                del self.user_index[reminder.user_id]
+        self.scheduler.discard(reminder_id)
+        return True
+    
+    def owns(self, reminder: Reminder) -> bool:
+        """このプロセスが担当するリマインダーか"""
+        return not self.sharded or shard_of(reminder.guild_id, self.shard_count) in self.owned_shards
+    
+    def _window_horizon(self) -> float:
+        """次回の取り込みまでに期限を迎えうる範囲（取り込み間隔の2倍先まで）"""
+        return time.time() + self.LEASE_RENEW_INTERVAL * 2
+    
+    def refresh(self):
+        """定期処理：シャードのリース更新、または期限の近いリマインダーの取り込み"""
+        if self.sharded:
+            self.refresh_ownership()
+        elif self.windowed:
+            self.load_window()
+    
+    def load_window(self):
+        """期限の近いリマインダーだけを取り込む（target_ts のインデックスで絞り込み）"""
+        for reminder in self.store.load_due(self._window_horizon()):
+            if reminder.id not in self.reminders and reminder.id not in self.in_flight:
+                self._register(reminder)
+    
+    def refresh_ownership(self):
+        """リースを更新し、担当シャードの期限の近いリマインダーを取り込む"""
+        shards = self.store.acquire_leases(self.owner_id, self.shard_count, self.LEASE_TTL)
+        if shards != self.owned_shards:
+            print(f"🔀 リマインダー担当シャード: {sorted(shards)} / {self.shard_count}")
+            # 手放したシャードの分だけをメモリから外す（新しい担当プロセスが取り込む）
+            released = self.owned_shards - shards
+            if released:
+                for reminder in list(self.reminders.values()):
+                    if shard_of(reminder.guild_id, self.shard_count) in released:
+                        self._unregister(reminder.id)
+            self.owned_shards = shards
+        # 他プロセスが追加した分も含め、直近分のみ取り込む（target_ts のインデックスで絞り込み）
+        # 配信中のものは後処理まではストアに残っているため、取り込み直して二重に配信しないよう除く
+        horizon = self._window_horizon()
+        for reminder in self.store.load_by_shards(shards, self.shard_count, before_ts=horizon):
+            if reminder.id not in self.reminders and reminder.id not in self.in_flight:
+                self._register(reminder)
+    
+    def filter_existing(self, reminders: List[Reminder]) -> List[Reminder]:
+        """他プロセスで削除済みのリマインダーを除外"""
+        if not self.sharded or not reminders:
+            return reminders
+        existing = self.store.existing_ids([r.id for r in reminders])
+        return [r for r in reminders if r.id in existing]
+    
+    def close(self):
+        """リースを解放してストアを閉じる"""
+        if self.sharded:
+            self.store.release_leases(self.owner_id)
+        self.store.close()
     
     def add_reminder(self, user_id: int, channel_id: int, message: str, 
                     target_time: datetime, mention_thread_users: bool = False, 
-                    thread_users: Set[int] = None) -> str:
+                    thread_users: Set[int] = None, recurrence: Optional[str] = None,
+                    guild_id: Optional[int] = None) -> str:
         """新しいリマインダーを追加"""
         reminder_id = str(uuid.uuid4())
-        reminder = {
-            "id": reminder_id,
-            "user_id": user_id,
-            "channel_id": channel_id,
-            "message": message,
-            "target_time": target_time.isoformat(),
-            "mention_thread_users": mention_thread_users,
-            "thread_users": list(thread_users) if thread_users else [],
-            "created_at": datetime.now().isoformat()
-        }
+        reminder = Reminder(
+            id=reminder_id,
+            user_id=user_id,
+            channel_id=channel_id,
+            message=message,
+            target_ts=to_epoch(target_time),
+            mention_thread_users=mention_thread_users,
+            thread_users=thread_users,
+            recurrence=recurrence,
+            guild_id=guild_id
+        )
         
-        reminders = self.load_reminders()
-        reminders.append(reminder)
-        self.save_reminders(reminders)
+        # 他プロセス担当のシャードであればストアへの保存のみ
+        if self.owns(reminder):
+            self._register(reminder)
+        self.store.put(reminder)
         return reminder_id
     
-    def get_due_reminders(self) -> List[Dict]:
-        """期限切れのリマインダーを取得"""
-        now = datetime.now()
-        reminders = self.load_reminders()
-        due_reminders = []
-        
-        for reminder in reminders:
-            target_time = datetime.fromisoformat(reminder["target_time"])
-            if target_time <= now:
-                due_reminders.append(reminder)
-        
-        return due_reminders
+    def get_due_reminders(self) -> List[Reminder]:
+        """期限切れのリマインダーを取得（スケジューラからは取り出し済み）"""
+        due_ids = self.scheduler.pop_due()
+        due = [self.reminders[rid] for rid in due_ids if rid in self.reminders]
+        self.in_flight.update(r.id for r in due)
+        return due
+    
+    def forget_in_flight(self, reminder_ids: List[str]):
+        """配信せずに手放したものを配信中の扱いから外す（担当に戻れば再び取り込む）"""
+        self.in_flight.difference_update(reminder_ids)
+    
+    def reschedule_recurring(self, reminders: List[Reminder]) -> List[Reminder]:
+        """繰り返しリマインダーの次回分だけを計算して再登録"""
+        now = int(time.time())
+        candidates = [r for r in reminders if r.recurrence]
+        # 配信中に削除されたものは再登録しない（シャード分担時は担当替え後もストアで確認）
+        if self.sharded:
+            existing = self.store.existing_ids([r.id for r in candidates]) if candidates else set()
+            candidates = [r for r in candidates if r.id in existing]
+        else:
+            candidates = [r for r in candidates if r.id in self.reminders]
+        rescheduled = []
+        for reminder in candidates:
+            try:
+                rule = parse_recurrence(reminder.recurrence)
+                # 停止中に過ぎた回はまとめて飛ばす（元の時刻の並びは維持）
+                reminder.target_ts = rule.next_run(reminder.target_ts, now)
+            except ValueError as e:
+                print(f"繰り返しルールエラー: {e}")
+                continue
+            self.in_flight.discard(reminder.id)
+            # 他プロセスの担当になっていればストアへの保存のみ（担当プロセスが取り込む）
+            if self.owns(reminder):
+                self._register(reminder)
+            self.store.put(reminder)
+            rescheduled.append(reminder)
+        return rescheduled
+    
+    def get_user_reminders(self, user_id: int) -> List[Reminder]:
+        """指定ユーザーのリマインダーを取得"""
+        if self.windowed:
+            # メモリに無い先の分（他プロセス担当分を含む）もあるためストアのインデックスを参照
+            return self.store.load_by_user(user_id)
+        return [self.reminders[rid] for rid in self.user_index.get(user_id, ())]
     
     def remove_reminder(self, reminder_id: str):
         """リマインダーを削除"""
-        reminders = self.load_reminders()
-        reminders = [r for r in reminders if r["id"] != reminder_id]
-        self.save_reminders(reminders)
+        self.remove_reminders([reminder_id])
+    
+    def remove_reminders(self, reminder_ids: List[str]) -> int:
+        """リマインダーをまとめて削除"""
+        self.in_flight.difference_update(reminder_ids)
+        removed = [rid for rid in reminder_ids if self._unregister(rid)]
+        if self.windowed:
+            # メモリに読み込んでいない分もストアからは削除する
+            removed = list(reminder_ids)
+        if removed:
+            self.store.delete(removed)
+        return len(removed)
+    
+    def remove_user_reminders(self, user_id: int) -> int:
+        """指定ユーザーのリマインダーを全て削除"""
+        return self.remove_reminders([r.id for r in self.get_user_reminders(user_id)])
     
     def cleanup_old_reminders(self, days: int = 7):
         """古いリマインダーをクリーンアップ"""
-        cutoff_date = datetime.now() - timedelta(days=days)
-        reminders = self.load_reminders()
-        
-        cleaned_reminders = []
-        for reminder in reminders:
-            target_time = datetime.fromisoformat(reminder["target_time"])
-            if target_time > cutoff_date:
-                cleaned_reminders.append(reminder)
+        cutoff_ts = to_epoch(datetime.now() - timedelta(days=days))
         
-        if len(cleaned_reminders) != len(reminders):
-            self.save_reminders(cleaned_reminders)
-            print(f"古いリマインダー {len(reminders) - len(cleaned_reminders)} 件をクリーンアップしました")
+        old_ids = [
+            rid for rid, reminder in self.reminders.items()
+            if reminder.target_ts <= cutoff_ts
+        ]
+        if self.remove_reminders(old_ids):
+            print(f"古いリマインダー {len(old_ids)} 件をクリーンアップしました")
 
 
 class ReminderCog(commands.Cog):
+    # この秒数以上遅れたリマインダーはキャッチアップとして低レートでまとめて配信
+    STALE_SECONDS = int(os.getenv("REMINDER_STALE_SECONDS", "120"))
+    CATCHUP_RATE = float(os.getenv("REMINDER_CATCHUP_RATE", "0.5"))
+    
     def __init__(self, bot):
         self.bot = bot
         print("🔄 Initializing ReminderCog...")
@@ -106,9 +237,19 @@ class ReminderCog(commands.Cog):
             print(f"❌ ReminderManager initialization failed: {e}")
             raise
         
+        self.delivery = ReminderDelivery(self.execute_reminder, self.finish_reminders)
+        self.catch_up = ReminderCatchUp(
+            self.execute_catch_up, rate=self.CATCHUP_RATE, select=self.select_catch_up
+        )
+        self.thread_participants = ThreadParticipantCache()
+        
         try:
             if not self.check_reminders.is_running():
                 self.check_reminders.start()  # バックグラウンドタスク開始
+                self.cleanup_reminders.start()
+                self.drain_catch_up.start()
+                if self.reminder_manager.windowed:
+                    self.refresh_store.start()
                 print("✅ Background task started")
             else:
                 print("⚠️ Background task already running")
@@ -122,55 +263,162 @@ class ReminderCog(commands.Cog):
     def cog_unload(self):
         """Cog終了時にタスクを停止"""
         self.check_reminders.cancel()
+        self.cleanup_reminders.cancel()
+        self.drain_catch_up.cancel()
+        self.refresh_store.cancel()
+        self.delivery.close()
+        self.reminder_manager.close()
     
-    @tasks.loop(minutes=1)
+    @tasks.loop()
     async def check_reminders(self):
-        """1分ごとにリマインダーをチェック"""
+        """次のリマインダー時刻まで待機して実行（追加・削除で先頭が変われば即座に再計算）"""
         try:
+            await self.reminder_manager.scheduler.wait_next()
             due_reminders = self.reminder_manager.get_due_reminders()
+            if not due_reminders:
+                return
             
-            for reminder in due_reminders:
-                await self.execute_reminder(reminder)
-                self.reminder_manager.remove_reminder(reminder["id"])
+            # 他プロセスで削除されたものを除外
+            deliverable = self.reminder_manager.filter_existing(due_reminders)
+            deliverable_ids = {r.id for r in deliverable}
+            self.reminder_manager.remove_reminders(
+                [r.id for r in due_reminders if r.id not in deliverable_ids]
+            )
+            
+            # 大きく遅れたもの（停止中に期限切れ等）はキャッチアップに回し、新しいものを優先
+            stale_before = time.time() - self.STALE_SECONDS
+            stale = [r for r in deliverable if r.target_ts < stale_before]
+            fresh = [r for r in deliverable if r.target_ts >= stale_before]
+            if stale:
+                print(f"⏳ 期限を大きく過ぎたリマインダー {len(stale)} 件をキャッチアップに回します")
+                self.catch_up.add(stale)
             
-            # 週1回古いリマインダーをクリーンアップ
-            if datetime.now().hour == 3 and datetime.now().minute == 0:
-                self.reminder_manager.cleanup_old_reminders()
+            # チャンネルごとの配信キューに渡し、送信完了を待たずに次の時刻の待機へ戻る
+            self.delivery.submit(fresh)
                 
         except Exception as e:
             print(f"リマインダーチェックエラー: {e}")
+            await asyncio.sleep(1)
     
     @check_reminders.before_loop
     async def before_check_reminders(self):
         """Bot起動完了まで待機"""
         await self.bot.wait_until_ready()
     
-    async def execute_reminder(self, reminder: Dict):
+    def select_catch_up(self, reminders: List[Reminder]) -> List[Reminder]:
+        """キュー待ちの間に削除・担当替えされたものを除く（このプロセスが配信するものだけを残す）"""
+        # 担当替えでメモリから外れた分は新しい担当プロセスが配信するため、送信も削除もしない
+        owned = [r for r in reminders if r.id in self.reminder_manager.reminders]
+        owned_ids = {r.id for r in owned}
+        self.reminder_manager.forget_in_flight([r.id for r in reminders if r.id not in owned_ids])
+        deliverable = self.reminder_manager.filter_existing(owned)
+        deliverable_ids = {r.id for r in deliverable}
+        self.reminder_manager.remove_reminders([r.id for r in owned if r.id not in deliverable_ids])
+        return deliverable
+    
+    def finish_reminders(self, reminders: List[Reminder]):
+        """配信済みリマインダーの後処理（繰り返し分は次回を再登録し、残りは一括削除）"""
+        rescheduled = self.reminder_manager.reschedule_recurring(reminders)
+        rescheduled_ids = {r.id for r in rescheduled}
+        self.reminder_manager.remove_reminders(
+            [r.id for r in reminders if r.id not in rescheduled_ids]
+        )
+    
+    @tasks.loop()
+    async def drain_catch_up(self):
+        """キャッチアップ対象を古い順に一定レートで配信"""
+        try:
+            batch = await self.catch_up.drain_one()
+            self.finish_reminders(batch)
+        except Exception as e:
+            print(f"リマインダーキャッチアップエラー: {e}")
+            await asyncio.sleep(1)
+    
+    @drain_catch_up.before_loop
+    async def before_drain_catch_up(self):
+        """Bot起動完了まで待機"""
+        await self.bot.wait_until_ready()
+    
+    @tasks.loop(seconds=ReminderManager.LEASE_RENEW_INTERVAL)
+    async def refresh_store(self):
+        """期限の近いリマインダーを取り込み、シャードのリースを更新（停止したプロセスの担当分を引き継ぐ）"""
+        try:
+            self.reminder_manager.refresh()
+        except Exception as e:
+            print(f"リマインダー取り込みエラー: {e}")
+    
+    @tasks.loop(time=dt_time(hour=3, tzinfo=datetime.now().astimezone().tzinfo))
+    async def cleanup_reminders(self):
+        """毎日3時に古いリマインダーをクリーンアップ"""
+        try:
+            self.reminder_manager.cleanup_old_reminders()
+        except Exception as e:
+            print(f"リマインダークリーンアップエラー: {e}")
+    
+    @staticmethod
+    def build_mentions(reminders: List[Reminder]) -> str:
+        """設定者と（必要なら）スレッドユーザーのメンション文字列を構築"""
+        owner_id = reminders[0].user_id
+        mentions = f"<@{owner_id}>"
+        
+        other_users = set()
+        for reminder in reminders:
+            if reminder.mention_thread_users and reminder.thread_users:
+                other_users.update(reminder.thread_users)
+        # 設定者を除外してスレッドユーザーを追加
+        other_users.discard(owner_id)
+        if other_users:
+            thread_mentions = " ".join([f"<@{uid}>" for uid in other_users])
+            mentions += f" {thread_mentions}"
+        return mentions
+    
+    async def execute_reminder(self, reminder: Reminder) -> bool:
         """リマインダーを実行"""
         try:
-            channel = self.bot.get_channel(reminder["channel_id"])
+            channel = self.bot.get_channel(reminder.channel_id)
             if not channel:
-                print(f"チャンネルが見つかりません: {reminder['channel_id']}")
-                return
+                print(f"チャンネルが見つかりません: {reminder.channel_id}")
+                return False
             
-            # メンション文字列を構築
-            mentions = f"<@{reminder['user_id']}>"
+            mentions = self.build_mentions([reminder])
+            await channel.send(f"⏰ {mentions} リマインダー: {reminder.message}")
+            return True
             
-            if reminder["mention_thread_users"] and reminder["thread_users"]:
-                # 設定者を除外してスレッドユーザーを追加
-                other_users = set(reminder["thread_users"]) - {reminder["user_id"]}
-                if other_users:
-                    thread_mentions = " ".join([f"<@{uid}>" for uid in other_users])
-                    mentions += f" {thread_mentions}"
+        except Exception as e:
+            print(f"リマインダー実行エラー: {e}")
+            return False
+    
+    async def execute_catch_up(self, reminders: List[Reminder]) -> bool:
+        """期限を過ぎた同一ユーザー・チャンネルのリマインダーを1通にまとめて送信"""
+        if len(reminders) == 1:
+            await self.delivery.acquire_channel(reminders[0].channel_id)
+            return await self.execute_reminder(reminders[0])
+        try:
+            channel = self.bot.get_channel(reminders[0].channel_id)
+            if not channel:
+                print(f"チャンネルが見つかりません: {reminders[0].channel_id}")
+                return False
             
-            await channel.send(f"⏰ {mentions} リマインダー: {reminder['message']}")
+            lines = [
+                f"⏰ {self.build_mentions(reminders)} "
+                f"期限を過ぎたリマインダーが {len(reminders)} 件あります:"
+            ]
+            for reminder in reminders[:20]:
+                lines.append(f"• {reminder.target_time.strftime('%m/%d %H:%M')} {reminder.message}")
+            if len(reminders) > 20:
+                lines.append(f"... 他 {len(reminders) - 20} 件")
+            
+            await self.delivery.acquire_channel(channel.id)
+            await channel.send("\n".join(lines)[:2000])
+            return True
             
         except Exception as e:
             print(f"リマインダー実行エラー: {e}")
+            return False
     
     @app_commands.command(name="remind", description="指定した時間後にリマインダーを設定します")
     @app_commands.describe(
-        time="リマインダーまでの時間 (例: 5m, 1h, 2d)",
+        time="リマインダーまでの時間 (例: 5m, 1h30m, 2d, 30分)",
         message="リマインダーメッセージ",
         mention_thread_users="スレッド内の過去の返信者もメンションするか (デフォルト: False)"
     )
@@ -234,7 +482,8 @@ class ReminderCog(commands.Cog):
                 message=message,
                 target_time=target_time,
                 mention_thread_users=mention_thread_users,
-                thread_users=thread_users
+                thread_users=thread_users,
+                guild_id=interaction.guild_id
             )
             
             # 設定完了メッセージにIDを追加
@@ -272,27 +521,28 @@ class ReminderCog(commands.Cog):
 
     def parse_time(self, time_str: str) -> Optional[int]:
         """時間文字列を解析して秒数を返す"""
-        time_str = time_str.lower().strip()
-        
-        # Regex patterns for different time formats
-        patterns = {
-            r'(\d+)s': 1,           # seconds
-            r'(\d+)m': 60,          # minutes
-            r'(\d+)h': 3600,        # hours
-            r'(\d+)d': 86400,       # days
-        }
-        
-        total_seconds = 0
-        
-        for pattern, multiplier in patterns.items():
-            matches = re.findall(pattern, time_str)
-            for match in matches:
-                total_seconds += int(match) * multiplier
-        
-        return total_seconds if total_seconds > 0 else None
+        return parse_duration(time_str)
+    
+    @remind.autocomplete("time")
+    async def time_autocomplete(self, interaction: discord.Interaction, current: str):
+        """入力中の時間をプレビュー付きで補完"""
+        choices = []
+        seconds = self.parse_time(current) if current else None
+        if seconds and seconds <= 86400 * 30:
+            target = datetime.now() + timedelta(seconds=seconds)
+            choices.append(app_commands.Choice(
+                name=f"{current} → {target.strftime('%m/%d %H:%M')}", value=current
+            ))
+        for preset in ("5m", "10m", "30m", "1h", "1h30m", "3h", "1d"):
+            if preset != current and preset.startswith(current.strip().lower()):
+                target = datetime.now() + timedelta(seconds=self.parse_time(preset))
+                choices.append(app_commands.Choice(
+                    name=f"{preset} → {target.strftime('%m/%d %H:%M')}", value=preset
+                ))
+        return choices[:25]
     
     async def get_thread_users(self, channel, limit: int = 50) -> Set[int]:
-        """スレッド内の過去のメッセージ送信者を取得"""
+        """スレッド内の過去のメッセージ送信者を取得（キャッシュが無い場合のみ履歴を取得）"""
         thread_users = set()
         
         try:
@@ -300,16 +550,33 @@ class ReminderCog(commands.Cog):
             if not hasattr(channel, 'parent'):
                 return thread_users
             
+            cached = self.thread_participants.get(channel.id)
+            if cached is not None:
+                return cached
+            
             # 過去のメッセージを取得
             async for message in channel.history(limit=limit):
                 if not message.author.bot:  # Botは除外
                     thread_users.add(message.author.id)
             
+            self.thread_participants.seed(channel.id, thread_users)
             return thread_users
         except Exception as e:
             print(f"スレッドユーザー取得エラー: {e}")
             return thread_users
     
+    @commands.Cog.listener()
+    async def on_message(self, message: discord.Message):
+        """キャッシュ済みスレッドの発言者を追加"""
+        if message.author.bot or not isinstance(message.channel, discord.Thread):
+            return
+        self.thread_participants.add(message.channel.id, message.author.id)
+    
+    @commands.Cog.listener()
+    async def on_raw_thread_delete(self, payload: discord.RawThreadDeleteEvent):
+        """削除されたスレッドのキャッシュを破棄"""
+        self.thread_participants.evict(payload.thread_id)
+    
     @app_commands.command(name="remind_at", description="指定した日時にリマインダーを設定します")
     @app_commands.describe(
         date="日付 (例: 2024-12-25, 12/25, 明日)",
@@ -389,7 +656,8 @@ class ReminderCog(commands.Cog):
                 message=message,
                 target_time=target_datetime,
                 mention_thread_users=mention_thread_users,
-                thread_users=thread_users
+                thread_users=thread_users,
+                guild_id=interaction.guild_id
             )
             
             # 設定完了メッセージにIDを追加
@@ -427,87 +695,62 @@ class ReminderCog(commands.Cog):
     
     def parse_datetime(self, date_str: str, time_str: str) -> Optional[datetime]:
         """日付と時刻文字列を解析してdatetimeオブジェクトを返す"""
+        return parse_datetime(date_str, time_str)
+
+    @app_commands.command(name="remind_every", description="繰り返しリマインダーを設定します")
+    @app_commands.describe(
+        rule="繰り返しルール (例: 1d, 12h, 毎日 9:00, 平日 9:30, cron形式 0 9 * * 1-5)",
+        message="リマインダーメッセージ"
+    )
+    async def remind_every(self, interaction: discord.Interaction, rule: str, message: str = "リマインダー！"):
+        """繰り返しリマインダーを設定"""
         try:
-            now = datetime.now()
-            target_date = None
-            
-            # 日付の解析
-            date_str = date_str.strip().lower()
-            
-            if date_str in ["今日", "today"]:
-                target_date = now.date()
-            elif date_str in ["明日", "tomorrow"]:
-                target_date = (now + timedelta(days=1)).date()
-            elif date_str in ["明後日"]:
-                target_date = (now + timedelta(days=2)).date()
-            else:
-                # 様々な日付形式を試行
-                date_formats = [
-                    "%Y-%m-%d",     # 2024-12-25
-                    "%Y/%m/%d",     # 2024/12/25
-                    "%m/%d",        # 12/25 (今年)
-                    "%m-%d",        # 12-25 (今年)
-                ]
-                
-                for fmt in date_formats:
-                    try:
-                        if fmt in ["%m/%d", "%m-%d"]:
-                            # 年を追加
-                            parsed_date = datetime.strptime(f"{now.year}-{date_str.replace('/', '-')}", "%Y-%m-%d").date()
-                            # 過去の日付の場合は来年にする
-                            if parsed_date < now.date():
-                                parsed_date = parsed_date.replace(year=now.year + 1)
-                            target_date = parsed_date
-                        else:
-                            target_date = datetime.strptime(date_str, fmt).date()
-                        break
-                    except ValueError:
-                        continue
-            
-            if target_date is None:
-                return None
-            
-            # 時刻の解析
-            time_str = time_str.strip().lower()
-            target_time = None
-            
-            # 様々な時刻形式を試行
-            time_formats = [
-                "%H:%M",        # 14:30
-                "%H:%M:%S",     # 14:30:00
-                "%I:%M%p",      # 2:30PM
-                "%I%p",         # 2PM
-            ]
-            
-            # AM/PM表記の正規化
-            time_str = time_str.replace("am", "AM").replace("pm", "PM")
-            if not ("AM" in time_str or "PM" in time_str):
-                # AM/PMがない場合は24時間形式として扱う
-                time_formats = ["%H:%M", "%H:%M:%S"] + time_formats
-            
-            for fmt in time_formats:
-                try:
-                    target_time = datetime.strptime(time_str, fmt).time()
-                    break
-                except ValueError:
-                    continue
+            try:
+                recurrence = parse_recurrence_rule(rule, self.parse_time(rule))
+            except ValueError as e:
+                await interaction.response.send_message(
+                    f"❌ 繰り返しルールが無効です: {e}\n"
+                    "**例:** 1d, 12h, 毎日 9:00, 平日 9:30, 0 9 * * 1-5",
+                    ephemeral=True
+                )
+                return
             
-            if target_time is None:
-                return None
+            first_ts = recurrence.next_after(int(time.time()))
+            if recurrence.next_after(first_ts) - first_ts < 60:
+                await interaction.response.send_message(
+                    "❌ 繰り返し間隔は1分以上で設定してください", 
+                    ephemeral=True
+                )
+                return
             
-            # 日付と時刻を結合
-            target_datetime = datetime.combine(target_date, target_time)
-            return target_datetime
+            reminder_id = self.reminder_manager.add_reminder(
+                user_id=interaction.user.id,
+                channel_id=interaction.channel.id,
+                message=message,
+                target_time=datetime.fromtimestamp(first_ts),
+                recurrence=recurrence.spec,
+                guild_id=interaction.guild_id
+            )
             
-        except Exception:
-            return None
+            await interaction.response.send_message(
+                f"✅ **繰り返しリマインダー設定完了**\n\n"
+                f"🔁 **繰り返し:** {recurrence.describe()}\n"
+                f"⏰ **次回:** {datetime.fromtimestamp(first_ts).strftime('%Y年%m月%d日 %H:%M')}\n"
+                f"💬 **メッセージ:** {message}\n"
+                f"🆔 **ID:** `{reminder_id[:8]}` (停止時に `/remind_delete` で使用)"
+            )
+                
+        except Exception as e:
+            await interaction.response.send_message(
+                f"❌ リマインダー設定エラー: {str(e)}", 
+                ephemeral=True
+            )
 
     @app_commands.command(name="remind_list", description="設定中のリマインダー一覧を表示します")
     async def remind_list(self, interaction: discord.Interaction):
         """設定中のリマインダー一覧を表示"""
         try:
-            reminders = self.reminder_manager.load_reminders()
-            user_reminders = [r for r in reminders if r["user_id"] == interaction.user.id]
+            user_reminders = self.reminder_manager.get_user_reminders(interaction.user.id)
             
             if not user_reminders:
                 await interaction.response.send_message(
@@ -517,26 +760,27 @@ class ReminderCog(commands.Cog):
                 return
             
             # リマインダーを時刻順にソート
-            user_reminders.sort(key=lambda x: x["target_time"])
+            user_reminders.sort(key=lambda x: x.target_ts)
             
             response = "**⏰ あなたのリマインダー一覧**\n\n"
             
             for i, reminder in enumerate(user_reminders[:10], 1):  # 最大10件表示
-                target_time = datetime.fromisoformat(reminder["target_time"])
-                formatted_time = target_time.strftime("%m/%d %H:%M")
+                formatted_time = reminder.target_time.strftime("%m/%d %H:%M")
                 
                 thread_info = ""
-                if reminder["mention_thread_users"] and reminder["thread_users"]:
-                    thread_info = f"📝 スレッド{len(reminder['thread_users'])}人"
+                if reminder.mention_thread_users and reminder.thread_users:
+                    thread_info = f"📝 スレッド{len(reminder.thread_users)}人"
                 else:
                     thread_info = "👤 個人"
+                if reminder.recurrence:
+                    thread_info += f" | 🔁 {parse_recurrence(reminder.recurrence).describe()}"
                 
                 # UUIDの最初の8文字を表示
-                short_id = reminder["id"][:8]
+                short_id = reminder.id[:8]
                 response += (
                     f"**{i}.** `{short_id}`\n"
                     f"⏰ **{formatted_time}** | {thread_info}\n"
-                    f"💬 {reminder['message']}\n\n"
+                    f"💬 {reminder.message}\n\n"
                 )
             
             if len(user_reminders) > 10:
@@ -559,13 +803,12 @@ class ReminderCog(commands.Cog):
     async def remind_delete(self, interaction: discord.Interaction, reminder_id: str):
         """指定したリマインダーを削除"""
         try:
-            reminders = self.reminder_manager.load_reminders()
-            user_reminders = [r for r in reminders if r["user_id"] == interaction.user.id]
+            user_reminders = self.reminder_manager.get_user_reminders(interaction.user.id)
             
             # 短縮IDまたは完全IDで検索
             target_reminder = None
             for reminder in user_reminders:
-                if reminder["id"].startswith(reminder_id) or reminder["id"] == reminder_id:
+                if reminder.id.startswith(reminder_id) or reminder.id == reminder_id:
                     target_reminder = reminder
                     break
             
@@ -578,15 +821,14 @@ class ReminderCog(commands.Cog):
                 return
             
             # リマインダーを削除
-            self.reminder_manager.remove_reminder(target_reminder["id"])
+            self.reminder_manager.remove_reminder(target_reminder.id)
             
-            target_time = datetime.fromisoformat(target_reminder["target_time"])
-            formatted_time = target_time.strftime("%Y年%m月%d日 %H:%M")
+            formatted_time = target_reminder.target_time.strftime("%Y年%m月%d日 %H:%M")
             
             await interaction.response.send_message(
                 f"✅ リマインダーを削除しました\n"
                 f"**時刻:** {formatted_time}\n"
-                f"**メッセージ:** {target_reminder['message']}",
+                f"**メッセージ:** {target_reminder.message}",
                 ephemeral=True
             )
             
@@ -600,8 +842,7 @@ class ReminderCog(commands.Cog):
     async def remind_clear(self, interaction: discord.Interaction):
         """設定中のリマインダーを全て削除"""
         try:
-            reminders = self.reminder_manager.load_reminders()
-            user_reminders = [r for r in reminders if r["user_id"] == interaction.user.id]
+            user_reminders = self.reminder_manager.get_user_reminders(interaction.user.id)
             
             if not user_reminders:
                 await interaction.response.send_message(
@@ -628,6 +869,43 @@ class ReminderCog(commands.Cog):
                 ephemeral=True
             )
 
+    @app_commands.command(name="remind_stats", description="リマインダー配信の遅延・キューの統計を表示します（管理者用）")
+    @app_commands.default_permissions(administrator=True)
+    async def remind_stats(self, interaction: discord.Interaction):
+        """リマインダー配信の統計（管理者用）"""
+        lag = self.delivery.get_lag_stats()
+        embed = discord.Embed(title="📊 リマインダー統計", color=0x4285f4)
+        embed.add_field(
+            name="⏱️ 配信遅延（直近の配信）",
+            value=(
+                f"{lag['count']}件 | p50 {lag['p50']:.3f}s / p95 {lag['p95']:.3f}s / max {lag['max']:.3f}s"
+                if lag['count'] else "記録なし"
+            ),
+            inline=False
+        )
+        embed.add_field(
+            name="📬 配信",
+            value=(
+                f"成功: {self.delivery.stats['delivered']}件 | 失敗: {self.delivery.stats['failed']}件\n"
+                f"配信待ち: {len(self.delivery)}件"
+            ),
+            inline=False
+        )
+        embed.add_field(
+            name="⏳ キャッチアップ",
+            value=(
+                f"待ち: {len(self.catch_up)}件 | 送信: {self.catch_up.stats['messages']}通"
+                f"（{self.catch_up.stats['coalesced']}件をまとめて配信）"
+            ),
+            inline=False
+        )
+        embed.add_field(
+            name="🗓️ スケジュール",
+            value=f"メモリ上の予定: {len(self.reminder_manager.scheduler)}件",
+            inline=False
+        )
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
 
 class ReminderHelp(commands.Cog):
     def __init__(self, bot):
@@ -640,19 +918,23 @@ class ReminderHelp(commands.Cog):
             "**基本コマンド:**\n"
             "• `/remind <時間> [メッセージ]` - 相対時間リマインダー\n"
             "• `/remind_at <日付> <時刻> [メッセージ]` - 絶対時間リマインダー\n"
+            "• `/remind_every <ルール> [メッセージ]` - 繰り返しリマインダー\n"
             "• `/remind_list` - リマインダー一覧表示\n"
             "• `/remind_delete <ID>` - リマインダー削除\n"
-            "• `/remind_clear` - 全リマインダー削除\n\n"
+            "• `/remind_clear` - 全リマインダー削除\n"
+            "• `/remind_stats` - 配信遅延・キューの統計（管理者用）\n\n"
             "**時間指定:**\n"
             "• 相対: `5m`, `1h`, `2d` (分/時間/日)\n"
-            "• 絶対: `明日 9:00`, `12/25 14:30`\n\n"
+            "• 絶対: `明日 9:00`, `12/25 14:30`\n"
+            "• 繰り返し: `1d`, `毎日 9:00`, `平日 9:30`, `0 9 * * 1-5` (cron形式)\n\n"
             "**使用例:**\n"
             "• `/remind 30m 会議準備` → ID表示\n"
             "• `/remind_at 明日 9:00 朝の会議` → ID表示\n"
+            "• `/remind_every 平日 9:30 朝会` → 平日毎朝リマインド\n"
             "• `/remind_delete a1b2c3d4` (表示されたIDで削除)\n"
             "• `/remind 1h 休憩 True` (スレッド全員にメンション)\n\n"
             "**特徴:**\n"
-            "• スレッド参加者一括メンション対応（過去50件のメッセージから取得）\n"
+            "• スレッド参加者一括メンション対応（初回は過去50件から取得し、以降の発言者も自動で追加）\n"
             "• 最大30日間設定可能"
         )
         await interaction.response.send_message(response, ephemeral=True)
@@ -672,12 +954,8 @@ class ClearConfirmView(discord.ui.View):
             return
         
         try:
-            # 全てのリマインダーを取得
-            all_reminders = self.reminder_manager.load_reminders()
-            # 他のユーザーのリマインダーのみ残す
-            other_reminders = [r for r in all_reminders if r["user_id"] != self.user_id]
-            # 保存
-            self.reminder_manager.save_reminders(other_reminders)
+            # 対象ユーザーのリマインダーのみ削除
+            self.reminder_manager.remove_user_reminders(self.user_id)
             
             await interaction.response.edit_message(
                 content=f"✅ リマインダー **{self.count}件** を全て削除しました",
@@ -1,76 +1,156 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import json
+import os
 import random
-
-def load_weapon_data():
-    with open("data/weapon_to_groups.json", "r", encoding="utf-8") as f:
-        return json.load(f)
-
-def load_team_patterns():
-    with open("data/team_patterns.json", "r", encoding="utf-8") as f:
-        return json.load(f)
+import time
+from typing import Dict, List, Optional
+from app.services.formation_store import FormationStore, formation_id
+from app.services.splatoon_data import DATA_LOAD_ERRORS, SplatoonDataRegistry
+from app.services.team_formation import FormationError, form_lobbies
+
+def format_team(team, name):
+    lines = [f"{name}"]
+    for weapon, role in team:
+        lines.append(f"・{weapon}（{role}）")
+    return "\n".join(lines)
+
+def split_message(blocks, limit=2000):
+    """ブロックを区切らずにDiscordの文字数上限ごとのメッセージにまとめる"""
+    messages = []
+    current = ""
+    for block in blocks:
+        if current and len(current) + len(block) + 2 > limit:
+            messages.append(current)
+            current = block
+        else:
+            current = f"{current}\n\n{block}" if current else block
+    if current:
+        messages.append(current)
+    return messages
+
+def render_formation(record: Dict, replay: bool = False) -> List[str]:
+    """保存形式の編成結果を送信用メッセージにする"""
+    pattern = record["pattern"]
+    lobbies = record["lobbies"]
+    heading = "🔁 ブキ編成結果（再表示）" if replay else "🎲 ブキ編成結果"
+    footer = f"ID: `{record['id']}`（`/splatoon_team_replay` で再表示できます）"
+    if len(lobbies) == 1:
+        alpha, bravo = lobbies[0]
+        return split_message([
+            f"{heading}【{pattern}】",
+            format_team(alpha, "アルファチーム"),
+            format_team(bravo, "ブラボチーム"),
+            footer,
+        ])
+    blocks = [f"{heading}【{pattern}】{len(lobbies)}ロビー（シード: {record['seed']}）"]
+    for i, (alpha, bravo) in enumerate(lobbies, 1):
+        blocks.append(
+            f"**ロビー{i}**\n" + format_team(alpha, "アルファチーム") + "\n" + format_team(bravo, "ブラボチーム")
+        )
+    blocks.append(footer)
+    return split_message(blocks)
 
 class WeaponFormation(commands.Cog):
-    def __init__(self, bot):
+    def __init__(self, bot, registry: SplatoonDataRegistry, store: FormationStore):
         self.bot = bot
+        self.registry = registry
+        self.store = store
+
+    def cog_unload(self):
+        self.store.close()
+
+    def _form(self, pattern: str, count: int, type_cap: Optional[int], unique: bool, seed: int) -> Dict:
+        """シードから編成して結果を保存（同じ条件・シードなら同じ結果になる）"""
+        splatoon_data = self.registry.get()
+        results = form_lobbies(
+            splatoon_data, splatoon_data.patterns[pattern], count, random.Random(seed),
+            unique_across_lobbies=unique, type_cap=type_cap
+        )
+        record = {
+            "id": formation_id(pattern, count, type_cap, unique, seed, splatoon_data.fingerprint),
+            "pattern": pattern,
+            "lobby_count": count,
+            "type_cap": type_cap,
+            "unique": unique,
+            "seed": seed,
+            "data_fingerprint": splatoon_data.fingerprint,
+            "lobbies": [[alpha, bravo] for alpha, bravo in results],
+            "created_at": time.time(),
+        }
+        self.store.put(record["id"], record)
+        return record
+
+    async def _send(self, interaction: discord.Interaction, messages: List[str]):
+        await interaction.response.send_message(messages[0])
+        for message in messages[1:]:
+            await interaction.followup.send(message)
 
     @app_commands.command(name="splatoon_team", description="チームにブキを編成します（パターン省略時はdefault）")
     @app_commands.describe(pattern="チーム編成パターンの名前（省略するとdefault）")
     async def formation(self, interaction: discord.Interaction, pattern: str = "default"):
-        data = load_weapon_data()
-        weapon_names = list(data.keys())
-        team_patterns = load_team_patterns()
-
-        if pattern in team_patterns:
-            selected_structure = team_patterns[pattern]
-        else:
+        if pattern not in self.registry.get().patterns:
             await interaction.response.send_message(f"⚠️ 指定されたパターン **{pattern}** は存在しません。", ephemeral=True)
             return
 
-        used_weapons = set()
-
-        def assign_weapons():
-            assigned = []
-            for role in selected_structure:
-                candidates = [name for name in weapon_names if role in data[name] and name not in used_weapons]
-                if not candidates:
-                    candidates = [name for name in weapon_names if name not in used_weapons]
-                chosen = random.choice(candidates)
-                used_weapons.add(chosen)
-                assigned.append((chosen, role.replace("role:", "")))
-            return assigned
-
-        alpha = assign_weapons()
-        bravo = assign_weapons()
-
-        def format_team(team, name):
-            lines = [f"{name}"]
-            for weapon, role in team:
-                lines.append(f"・{weapon}（{role}）")
-            return "\n".join(lines)
-
-        response = f"🎲 ブキ編成結果【{pattern}】\n\n"
-        response += format_team(alpha, "アルファチーム") + "\n\n"
-        response += format_team(bravo, "ブラボチーム")
-        await interaction.response.send_message(response)
+        record = self._form(pattern, 1, None, True, random.getrandbits(32))
+        await self._send(interaction, render_formation(record))
 
     @formation.autocomplete("pattern")
     async def pattern_autocomplete(self, interaction: discord.Interaction, current: str):
-        patterns = load_team_patterns()
-        matches = [p for p in patterns.keys() if current.lower() in p.lower()]
-        return [app_commands.Choice(name=m, value=m) for m in matches[:25]]
+        matches = self.registry.get().pattern_index.search(current)
+        return [app_commands.Choice(name=m, value=m) for m in matches]
+
+    @app_commands.command(name="splatoon_lobbies", description="複数ロビー分のブキ編成をまとめて作成します")
+    @app_commands.describe(
+        count="ロビー数（1〜20）",
+        pattern="チーム編成パターンの名前（省略するとdefault）",
+        type_cap="1チーム内の同じブキ種の上限（0で制限なし、デフォルト: 2）",
+        unique="全ロビーを通してブキを重複させないか（デフォルト: True）",
+        seed="乱数シード（同じ条件・シードなら同じ編成になります）"
+    )
+    async def lobbies(self, interaction: discord.Interaction, count: app_commands.Range[int, 1, 20],
+                      pattern: str = "default", type_cap: app_commands.Range[int, 0, 4] = 2,
+                      unique: bool = True, seed: Optional[int] = None):
+        if pattern not in self.registry.get().patterns:
+            await interaction.response.send_message(f"⚠️ 指定されたパターン **{pattern}** は存在しません。", ephemeral=True)
+            return
+        if seed is None:
+            seed = random.getrandbits(32)
+
+        try:
+            record = self._form(pattern, count, type_cap or None, unique, seed)
+        except FormationError as e:
+            await interaction.response.send_message(f"⚠️ 編成できませんでした: {e}", ephemeral=True)
+            return
+        await self._send(interaction, render_formation(record))
+
+    @lobbies.autocomplete("pattern")
+    async def lobbies_pattern_autocomplete(self, interaction: discord.Interaction, current: str):
+        matches = self.registry.get().pattern_index.search(current)
+        return [app_commands.Choice(name=m, value=m) for m in matches]
+
+    @app_commands.command(name="splatoon_team_replay", description="編成結果のIDから同じ編成を再表示します")
+    @app_commands.describe(result_id="編成結果に表示されたID")
+    async def replay(self, interaction: discord.Interaction, result_id: str):
+        record = self.store.get(result_id.strip().strip("`").lower())
+        if record is None:
+            await interaction.response.send_message(
+                f"⚠️ ID **{result_id}** の編成結果は見つかりませんでした（古い結果は削除されている場合があります）。",
+                ephemeral=True
+            )
+            return
+        await self._send(interaction, render_formation(record, replay=True))
 
 class WeaponLookup(commands.Cog):
-    def __init__(self, bot):
+    def __init__(self, bot, registry: SplatoonDataRegistry):
         self.bot = bot
-        self.weapon_data = load_weapon_data()
+        self.registry = registry
 
     @app_commands.command(name="splatoon_weapon", description="指定したブキのロールとタイプを表示します")
     @app_commands.describe(weapon_name="調べたいブキ名を入力してください")
     async def lookup_weapon(self, interaction: discord.Interaction, weapon_name: str):
-        data = self.weapon_data
+        data = self.registry.get().weapons
         if weapon_name in data:
             roles = [entry for entry in data[weapon_name] if entry.startswith("role:")]
             types = [entry for entry in data[weapon_name] if entry.startswith("type:")]
@@ -83,16 +163,15 @@ class WeaponLookup(commands.Cog):
 
     @lookup_weapon.autocomplete("weapon_name")
     async def weapon_autocomplete(self, interaction: discord.Interaction, current: str):
-        data = load_weapon_data()
-        matches = [w for w in data.keys() if current.lower() in w.lower()]
-        return [app_commands.Choice(name=w, value=w) for w in matches[:25]]
+        matches = self.registry.get().weapon_index.search(current)
+        return [app_commands.Choice(name=w, value=w) for w in matches]
 
     @app_commands.command(name="splatoon_role", description="指定したロールに含まれる全ブキを表示します")
     @app_commands.describe(role_name="調べたいロール名（例: 前衛キル特化ブキ）")
     async def list_by_role(self, interaction: discord.Interaction, role_name: str):
         target_role = f"role:{role_name}"
-        data = self.weapon_data
-        matches = [name for name, tags in data.items() if target_role in tags]
+        data = self.registry.get()
+        matches = data.names(data.query((target_role,)))
         if matches:
             response = f"🔎 ロール **{role_name}** に該当するブキ一覧（{len(matches)}個）:\n" + "\n".join(f"・{m}" for m in matches)
         else:
@@ -101,17 +180,13 @@ class WeaponLookup(commands.Cog):
 
     @list_by_role.autocomplete("role_name")
     async def role_autocomplete(self, interaction: discord.Interaction, current: str):
-        data = self.weapon_data
-        all_roles = set()
-        for tags in data.values():
-            all_roles.update(tag.replace("role:", "") for tag in tags if tag.startswith("role:"))
-        matches = [r for r in all_roles if current.lower() in r.lower()]
-        return [app_commands.Choice(name=r, value=r) for r in sorted(matches)[:25]]
+        matches = self.registry.get().role_index.search(current)
+        return [app_commands.Choice(name=r, value=r) for r in matches]
 
     @app_commands.command(name="splatoon_pattern", description="編成パターンの一覧または詳細を表示します")
     @app_commands.describe(pattern="（オプション）表示したいパターン名")
     async def show_pattern(self, interaction: discord.Interaction, pattern: str = None):
-        patterns = load_team_patterns()
+        patterns = self.registry.get().patterns
         if pattern:
             if pattern in patterns:
                 roles = [r.replace("role:", "") for r in patterns[pattern]]
@@ -124,9 +199,18 @@ class WeaponLookup(commands.Cog):
 
     @show_pattern.autocomplete("pattern")
     async def pattern_autocomplete(self, interaction: discord.Interaction, current: str):
-        patterns = load_team_patterns()
-        matches = [p for p in patterns.keys() if current.lower() in p.lower()]
-        return [app_commands.Choice(name=m, value=m) for m in matches[:25]]
+        matches = self.registry.get().pattern_index.search(current)
+        return [app_commands.Choice(name=m, value=m) for m in matches]
+
+    @app_commands.command(name="splatoon_reload", description="ブキデータと編成パターンを再読み込みします（管理者用）")
+    @app_commands.default_permissions(administrator=True)
+    async def reload_data(self, interaction: discord.Interaction):
+        try:
+            data = self.registry.reload()
+            response = f"✅ 再読み込みしました（ブキ {len(data.weapons)}個、パターン {len(data.patterns)}個）"
+        except DATA_LOAD_ERRORS as e:
+            response = f"❌ 再読み込みに失敗しました（現在のデータを継続使用）: {e}"
+        await interaction.response.send_message(response, ephemeral=True)
 
 class SplatoonHelp(commands.Cog):
     def __init__(self, bot):
@@ -138,18 +222,28 @@ class SplatoonHelp(commands.Cog):
             "**🎮 スプラトゥーン機能 コマンド一覧**\n\n"
             "👉 `/splatoon_team [pattern]`\n"
             "　- チームごとにランダムなブキを編成します（pattern省略でdefault）\n\n"
+            "👉 `/splatoon_lobbies <ロビー数> [pattern] [type_cap] [unique] [seed]`\n"
+            "　- 最大20ロビー分の編成をまとめて作成します（ロビー間でブキ重複なし・同じブキ種の上限あり）\n\n"
+            "👉 `/splatoon_team_replay <ID>`\n"
+            "　- 編成結果に表示されたIDから、同じ編成をもう一度表示します\n\n"
             "👉 `/splatoon_weapon <ブキ名>`\n"
-            "　- 指定したブキのロールとタイプを表示します（補完あり）\n\n"
+            "　- 指定したブキのロールとタイプを表示します（補完あり、ひらがな・半角カナでも検索可）\n\n"
             "👉 `/splatoon_role <ロール名>`\n"
             "　- 指定したロールに属するブキをすべて表示します（補完あり）\n\n"
             "👉 `/splatoon_pattern [パターン名]`\n"
             "　- 登録済みの編成パターンを確認できます（補完あり）\n\n"
+            "👉 `/splatoon_reload`\n"
+            "　- データファイルを再読み込みします（管理者用、ファイル更新時は自動で反映）\n\n"
             "👉 `/splatoon_help`\n"
             "　- このコマンド一覧を表示します"
         )
         await interaction.response.send_message(response, ephemeral=True)
 
 async def setup(bot):
-    await bot.add_cog(WeaponFormation(bot))
-    await bot.add_cog(WeaponLookup(bot))
+    # ブキデータは全Cogで共有（起動時に一度だけ読み込む）
+    registry = SplatoonDataRegistry()
+    registry.reload()
+    store = FormationStore(os.getenv("SPLATOON_FORMATION_DB", "data/formations.db"))
+    await bot.add_cog(WeaponFormation(bot, registry, store))
+    await bot.add_cog(WeaponLookup(bot, registry))
     await bot.add_cog(SplatoonHelp(bot))
\ No newline at end of file
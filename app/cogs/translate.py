@@ -1,12 +1,93 @@
+import os
+from collections import OrderedDict
+from datetime import date
 import discord
 from discord.ext import commands
 from discord import app_commands
 from app.services.translate_service import TranslateService
 
+# 国旗リアクションによる翻訳を有効にするか（メッセージ本文の取得に message_content インテントが必要）
+REACTION_TRANSLATE_ENABLED = os.getenv("TRANSLATE_REACTIONS", "").lower() in ("1", "true", "yes")
+
 class TranslateCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.translate_service = TranslateService()
+        # 国旗絵文字 -> 言語コード
+        self.flag_languages = {info['flag']: code for code, info in self.translate_service.LANGUAGES.items()}
+        self.flag_languages['🇬🇧'] = 'en'
+        # 同じメッセージ・言語への返信は1回だけ
+        self._reaction_replies: "OrderedDict[tuple, None]" = OrderedDict()
+        self.translate_menu = app_commands.ContextMenu(
+            name="Translate to…",
+            callback=self.translate_message_menu
+        )
+        self.bot.tree.add_command(self.translate_menu)
+
+    def cog_unload(self):
+        """Cog終了時に翻訳スレッドプールを停止"""
+        self.bot.tree.remove_command(self.translate_menu.name, type=self.translate_menu.type)
+        self.translate_service.close()
+
+    async def translate_message_menu(self, interaction: discord.Interaction, message: discord.Message):
+        """メッセージのコンテキストメニューから翻訳先を選んで翻訳"""
+        if not message.content:
+            await interaction.response.send_message("❌ 翻訳できるテキストがありません", ephemeral=True)
+            return
+        view = LanguageSelectView(self.translate_service, message, interaction.user.id)
+        await interaction.response.send_message("🌐 翻訳先の言語を選択してください", view=view, ephemeral=True)
+
+    @commands.Cog.listener()
+    async def on_raw_reaction_add(self, payload: discord.RawReactionActionEvent):
+        """国旗リアクションが付いたメッセージをその国の言語に翻訳して返信"""
+        if not REACTION_TRANSLATE_ENABLED or payload.user_id == self.bot.user.id:
+            return
+        target_lang = self.flag_languages.get(str(payload.emoji))
+        if target_lang is None:
+            return
+        reply_key = (payload.message_id, target_lang)
+        if reply_key in self._reaction_replies:
+            return
+        
+        channel = self.bot.get_channel(payload.channel_id)
+        if channel is None:
+            return
+        # 翻訳を待つ間に同じ国旗が重ねて付いても二重に返信しないよう、先に予約しておく
+        self._reaction_replies[reply_key] = None
+        while len(self._reaction_replies) > 1000:
+            self._reaction_replies.popitem(last=False)
+        handled = False
+        try:
+            # 一度取得したメッセージは本文をキャッシュから使う
+            cached = self.translate_service.get_cached_message(payload.message_id)
+            if cached is not None:
+                text = cached[0]
+            else:
+                text = (await channel.fetch_message(payload.message_id)).content
+            if not text:
+                handled = True
+                return
+            
+            result = await self.translate_service.translate_message(
+                payload.message_id, text, target_lang, payload.user_id
+            )
+            if result.get('skipped'):
+                handled = True
+                return
+            if not result['success']:
+                return
+            
+            flag = self.translate_service.get_language_info(target_lang).get('flag', '🌐')
+            await channel.get_partial_message(payload.message_id).reply(
+                f"{flag} {result['translated_text']}", mention_author=False
+            )
+            handled = True
+        except discord.HTTPException as e:
+            print(f"リアクション翻訳エラー: {e}")
+        finally:
+            # 失敗した場合は予約を外し、付け直しで再試行できるようにする
+            if not handled:
+                self._reaction_replies.pop(reply_key, None)
 
     @app_commands.command(name="translate", description="テキストを指定した言語に翻訳します")
     @app_commands.describe(
@@ -14,7 +95,7 @@ class TranslateCog(commands.Cog):
         text="翻訳したいテキスト",
         show_details="原文と言語情報を表示するかどうか (デフォルト: False)"
     )
-    @app_commands.choices(language=TranslateService().get_language_choices())
+    @app_commands.choices(language=TranslateService.get_language_choices())
     async def translate(self, interaction: discord.Interaction, language: str, text: str, show_details: bool = False):
         """翻訳コマンドのメイン処理"""
         await interaction.response.defer()
@@ -90,7 +171,10 @@ class TranslateCog(commands.Cog):
             
             # 使用統計とフッター情報
             user_stats = self.translate_service.get_user_stats(interaction.user.id)
-            cache_indicator = "💾" if result.get('cached', False) else ""
+            cache_indicator = ""
+            if result.get('cached', False):
+                cache_stats = self.translate_service.get_cache_stats()
+                cache_indicator = f"💾 キャッシュ (命中率 {cache_stats['hit_rate']:.0%})"
             
             footer_text = (
                 f"今日の使用: {user_stats['daily']}/{self.translate_service.RATE_LIMITS['per_day']} | "
@@ -121,6 +205,124 @@ class TranslateCog(commands.Cog):
             else:
                 await interaction.followup.send(result['translated_text'])
 
+    @app_commands.command(name="translate_all", description="テキストを全ての対応言語に一括翻訳します")
+    @app_commands.describe(text="翻訳したいテキスト")
+    async def translate_all(self, interaction: discord.Interaction, text: str):
+        """全対応言語への一括翻訳（使用回数は1回として数える）"""
+        await interaction.response.defer()
+        
+        result = await self.translate_service.translate_batch(
+            text=text,
+            target_langs=None,
+            user_id=interaction.user.id
+        )
+        
+        if not result['success']:
+            embed = discord.Embed(
+                title="❌ 翻訳エラー",
+                description=result['error'],
+                color=0xff4444
+            )
+            await interaction.followup.send(embed=embed, ephemeral=True)
+            return
+        
+        original_display = result['original_text']
+        if len(original_display) > 200:
+            original_display = original_display[:200] + "..."
+        
+        embed = discord.Embed(
+            title="🌐 一括翻訳結果",
+            description=f"```{original_display}```",
+            color=0x4285f4
+        )
+        
+        # 言語ごとの結果（埋め込み全体の文字数制限に収まるよう省略）
+        for item in result['results']:
+            info = self.translate_service.get_language_info(item['target_lang'])
+            name = f"{info.get('flag', '🌐')} {info.get('name', item['target_lang'])}"
+            if not item['success']:
+                embed.add_field(name=name, value=item['error'], inline=False)
+                continue
+            translated_display = item['translated_text']
+            if len(translated_display) > 500:
+                translated_display = translated_display[:500] + "..."
+            if item['cached']:
+                name += " 💾"
+            embed.add_field(name=name, value=translated_display, inline=False)
+        
+        user_stats = self.translate_service.get_user_stats(interaction.user.id)
+        embed.set_footer(
+            text=(
+                f"今日の使用: {user_stats['daily']}/{self.translate_service.RATE_LIMITS['per_day']} | "
+                f"処理時間: {result['process_time']:.1f}秒 | 💾 = キャッシュ"
+            )
+        )
+        
+        await interaction.followup.send(embed=embed)
+
+    @app_commands.command(name="translate_stats", description="翻訳機能の処理時間・キャッシュ・バックエンドの統計を表示します（管理者用）")
+    @app_commands.default_permissions(administrator=True)
+    async def translate_stats(self, interaction: discord.Interaction):
+        """翻訳機能の統計（管理者用）"""
+        stats = self.translate_service.get_global_stats()
+        
+        def fmt(summary: dict) -> str:
+            if not summary['count']:
+                return "記録なし"
+            return (
+                f"{summary['count']}件 | p50 {summary['p50'] * 1000:.0f}ms / "
+                f"p95 {summary['p95'] * 1000:.0f}ms / p99 {summary['p99'] * 1000:.0f}ms"
+            )
+        
+        embed = discord.Embed(
+            title="📊 翻訳統計",
+            description=(
+                f"累計: {stats['total_translations']}件 | "
+                f"今日: {stats['daily_translations'].get(date.today().isoformat(), 0)}件"
+            ),
+            color=0x4285f4
+        )
+        
+        for window, summary in stats['latency'].items():
+            lines = [f"**全体**: {fmt(summary['overall'])}"]
+            for label, source_summary in summary['source'].items():
+                lines.append(f"`{label}`: {fmt(source_summary)}")
+            embed.add_field(name=f"⏱️ 処理時間（直近{window}）", value="\n".join(lines), inline=False)
+        
+        hourly = stats['latency']['1h']
+        if hourly['outcome']:
+            embed.add_field(
+                name="📋 結果別（直近1h）",
+                value="\n".join(f"`{label}`: {fmt(s)}" for label, s in hourly['outcome'].items()),
+                inline=False
+            )
+        if hourly['lang']:
+            embed.add_field(
+                name="🌍 言語別（直近1h）",
+                value="\n".join(
+                    f"{self.translate_service.get_language_info(label).get('flag', '🌐')} `{label}`: {fmt(s)}"
+                    for label, s in hourly['lang'].items()
+                ),
+                inline=False
+            )
+        
+        cache = stats['cache']
+        embed.add_field(
+            name="💾 キャッシュ",
+            value=f"{cache['entries']}件 | 命中率 {cache['hit_rate']:.0%} | 追い出し {cache['evictions']}件",
+            inline=False
+        )
+        embed.add_field(
+            name="🔌 バックエンド",
+            value="\n".join(
+                f"`{b['name']}`: {b['state']} | 成功 {b['successes']} / 失敗 {b['failures']}"
+                for b in stats['backends']
+            ),
+            inline=False
+        )
+        
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
     @app_commands.command(name="translate_help", description="翻訳機能のヘルプを表示します")
     async def translate_help(self, interaction: discord.Interaction):
         """翻訳機能のヘルプ"""
@@ -140,7 +342,9 @@ class TranslateCog(commands.Cog):
                 "**例:**\n"
                 "`/translate language:en text:今日はいい天気ですね` → 翻訳結果のみ\n"
                 "`/translate language:🇯🇵 日本語 (ja) text:Hello` → 選択肢から選択\n"
-                "`/translate language:ja text:Hello show_details:True` → 詳細+コピー用"
+                "`/translate language:ja text:Hello show_details:True` → 詳細+コピー用\n"
+                "`/translate_all text:お知らせです` → 全対応言語へ一括翻訳（1回分として計上）\n"
+                "メッセージを右クリック →「アプリ」→「Translate to…」→ 言語を選択"
             ),
             inline=False
         )
@@ -175,7 +379,8 @@ class TranslateCog(commands.Cog):
             value=(
                 "• 高精度な翻訳（Google翻訳ベース）\n"
                 "• 柔軟な言語入力（選択肢・直接入力対応）\n"
-                "• 自動言語検出\n"
+                "• 自動言語検出（原文と翻訳先が同じ言語なら翻訳しない）\n"
+                "• 国旗リアクションで翻訳（サーバー設定で有効な場合）\n"
                 "• 翻訳結果キャッシュ（高速化）\n"
                 "• シンプル表示（デフォルト）と詳細表示の選択\n"
                 "• 詳細表示時のコピー用テキスト提供\n"
@@ -209,5 +414,39 @@ class TranslateCog(commands.Cog):
         
         return ""
 
+class LanguageSelectView(discord.ui.View):
+    def __init__(self, translate_service: TranslateService, message: discord.Message, user_id: int):
+        super().__init__(timeout=60)
+        self.translate_service = translate_service
+        self.message = message
+        self.user_id = user_id
+        
+        select = discord.ui.Select(
+            placeholder="翻訳先の言語",
+            options=[
+                discord.SelectOption(label=info['name'], value=code, emoji=info['flag'])
+                for code, info in translate_service.LANGUAGES.items()
+            ]
+        )
+        select.callback = self.on_select
+        self.add_item(select)
+
+    async def on_select(self, interaction: discord.Interaction):
+        target_lang = interaction.data['values'][0]
+        await interaction.response.defer()
+        
+        result = await self.translate_service.translate_message(
+            self.message.id, self.message.content, target_lang, self.user_id
+        )
+        if not result['success']:
+            content = f"❌ {result['error']}"
+        elif result.get('skipped'):
+            content = "ℹ️ このメッセージはすでに選択した言語で書かれています"
+        else:
+            source_flag = self.translate_service.get_language_info(result['source_lang']).get('flag', '🌐')
+            target_flag = self.translate_service.get_language_info(target_lang).get('flag', '🌐')
+            content = f"{source_flag} → {target_flag}\n{result['translated_text']}"
+        await interaction.edit_original_response(content=content, view=self)
+
 async def setup(bot):
     await bot.add_cog(TranslateCog(bot))
\ No newline at end of file
@@ -0,0 +1,105 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+_ID_ALPHABET = "0123456789abcdefghijklmnopqrstuvwxyz"
+
+
+def formation_id(pattern: str, lobby_count: int, type_cap: Optional[int], unique: bool, seed: int,
+                 data_fingerprint: str) -> str:
+    """編成条件・シード・データの指紋から短いID（英数字8文字以内）を作る
+
+    同じデータ・条件・シードなら編成結果も同じになるため、IDも同じになる。
+    データが再読み込みで変わると別のIDになり、共有済みのIDの記録は上書きされない。
+    """
+    key = json.dumps([pattern, lobby_count, type_cap, unique, seed, data_fingerprint], ensure_ascii=False)
+    value = int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=5).digest(), "big")
+    digits = []
+    while True:
+        value, r = divmod(value, 36)
+        digits.append(_ID_ALPHABET[r])
+        if not value:
+            break
+    return "".join(reversed(digits))
+
+
+class FormationStore:
+    """編成結果をIDで保存する、メモリLRU + SQLite（件数上限付きLRU）の2段ストア
+
+    記録は {'pattern', 'lobby_count', 'type_cap', 'unique', 'seed', 'data_fingerprint', 'lobbies', 'created_at'}。
+    lobbies は [[アルファ, ブラボ], ...]、各チームは [[ブキ名, ロール名], ...]。
+    """
+
+    def __init__(self, db_path: str = "data/formations.db", memory_entries: int = 100,
+                 max_entries: int = 5000):
+        self.memory_entries = memory_entries
+        self.max_entries = max_entries
+        self._memory: "OrderedDict[str, Dict]" = OrderedDict()
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS formations (
+                id TEXT PRIMARY KEY,
+                payload TEXT NOT NULL,
+                last_used REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_formations_last_used ON formations (last_used);
+        """)
+        self._count = self.conn.execute("SELECT COUNT(*) FROM formations").fetchone()[0]
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _remember(self, formation_id: str, record: Dict):
+        self._memory[formation_id] = record
+        self._memory.move_to_end(formation_id)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, formation_id: str) -> Optional[Dict]:
+        """IDの編成結果を取得（なければNone）"""
+        record = self._memory.get(formation_id)
+        if record is None:
+            row = self.conn.execute("SELECT payload FROM formations WHERE id = ?", (formation_id,)).fetchone()
+            if row is None:
+                return None
+            record = json.loads(row[0])
+        # メモリから返す場合もSQLite側の最終使用時刻を更新し、よく再表示されるものを削除対象にしない
+        with self.conn:
+            self.conn.execute("UPDATE formations SET last_used = ? WHERE id = ?", (time.time(), formation_id))
+        self._remember(formation_id, record)
+        return record
+
+    def put(self, formation_id: str, record: Dict):
+        """編成結果を保存（同じIDは上書き）"""
+        payload = json.dumps(record, ensure_ascii=False)
+        with self.conn:
+            exists = self.conn.execute("SELECT 1 FROM formations WHERE id = ?", (formation_id,)).fetchone()
+            self.conn.execute(
+                "INSERT OR REPLACE INTO formations (id, payload, last_used) VALUES (?, ?, ?)",
+                (formation_id, payload, time.time())
+            )
+        if exists is None:
+            self._count += 1
+        self._remember(formation_id, record)
+        if self._count > self.max_entries:
+            self._evict()
+
+    def _evict(self):
+        """件数の9割まで、最も長く使われていないものから削除"""
+        overflow = self._count - int(self.max_entries * 0.9)
+        with self.conn:
+            self.conn.execute(
+                "DELETE FROM formations WHERE id IN (SELECT id FROM formations ORDER BY last_used LIMIT ?)",
+                (overflow,)
+            )
+        self._count = self.conn.execute("SELECT COUNT(*) FROM formations").fetchone()[0]
+
+    def close(self):
+        self.conn.close()
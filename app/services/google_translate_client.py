@@ -0,0 +1,92 @@
+import threading
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+import requests
+import deep_translator.google as deep_translator_google
+from deep_translator import GoogleTranslator
+
+
+class _SessionRouter:
+    """deep_translator.google が参照する requests の代わりに置き、
+    セッションを指定したスレッドの requests.get だけを共有セッションに振り向ける
+
+    翻訳処理そのもの（再試行などを含む）はライブラリの実装をそのまま使う。
+    """
+
+    def __init__(self, fallback):
+        self._fallback = fallback
+        self._local = threading.local()
+
+    def __getattr__(self, name):
+        return getattr(self._fallback, name)
+
+    def get(self, url, **kwargs):
+        binding = getattr(self._local, "binding", None)
+        if binding is None:
+            return self._fallback.get(url, **kwargs)
+        session, timeout = binding
+        kwargs.setdefault("timeout", timeout)
+        return session.get(url, **kwargs)
+
+    @contextmanager
+    def bind(self, session: requests.Session, timeout: Optional[float]):
+        """このスレッドの間だけ session 経由でリクエストする"""
+        previous = getattr(self._local, "binding", None)
+        self._local.binding = (session, timeout)
+        try:
+            yield
+        finally:
+            self._local.binding = previous
+
+
+if not isinstance(deep_translator_google.requests, _SessionRouter):
+    deep_translator_google.requests = _SessionRouter(deep_translator_google.requests)
+_router: _SessionRouter = deep_translator_google.requests
+
+
+class PooledGoogleTranslator(GoogleTranslator):
+    """共有HTTPセッション（keep-alive）経由でリクエストするGoogleTranslator"""
+
+    def __init__(self, session: requests.Session, source: str = "auto", target: str = "en",
+                 timeout: Optional[float] = None, **kwargs):
+        super().__init__(source=source, target=target, **kwargs)
+        self.session = session
+        self.timeout = timeout
+
+    def translate(self, text: str, **kwargs) -> str:
+        with _router.bind(self.session, self.timeout):
+            translated = super().translate(text, **kwargs)
+        # 記号のみの入力などで訳文が原文と同じ場合、ライブラリは None を返すことがある
+        return text.strip() if translated is None else translated
+
+
+class GoogleTranslatorPool:
+    """翻訳先言語ごとのクライアントをスレッド単位で再利用し、HTTP接続を共有"""
+
+    def __init__(self, pool_size: int = 4, timeout: Optional[float] = None):
+        self.timeout = timeout  # 1リクエストあたりのタイムアウト（秒）
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=2, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        # GoogleTranslatorはリクエストごとにパラメータを書き換えるため、スレッド間では共有しない
+        self._local = threading.local()
+
+    def get(self, target_lang: str) -> PooledGoogleTranslator:
+        """現在のスレッド用のクライアントを取得（なければ作成）"""
+        translators: Dict[str, PooledGoogleTranslator] = getattr(self._local, "translators", None)
+        if translators is None:
+            translators = self._local.translators = {}
+        translator = translators.get(target_lang)
+        if translator is None:
+            translator = translators[target_lang] = PooledGoogleTranslator(
+                self.session, source="auto", target=target_lang, timeout=self.timeout
+            )
+        return translator
+
+    def translate(self, text: str, target_lang: str) -> str:
+        return self.get(target_lang).translate(text)
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,58 @@
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Optional
+
+# 文字種による判定
+_KANA = re.compile(r"[぀-ヿｦ-ﾟ]")
+_HANGUL = re.compile(r"[가-힯ᄀ-ᇿ㄰-㆏]")
+_HAN = re.compile(r"[一-鿿]")
+_LATIN_WORD = re.compile(r"[a-zà-öø-ÿ']+")
+
+# 簡体字・繁体字のどちらかにしかない頻出字（日本語の漢字と同じ字形のものは除く）
+_SIMPLIFIED = set("这们说时对为过还发样个见现关开门问间长车东书话应该让认计记设读谁么吗气实")
+_TRADITIONAL = set("這們來說國會對還發樣關讓應讀麼嗎裡氣學實點體")
+
+# ラテン文字言語の頻出語と固有の文字
+_STOPWORDS = {
+    "en": {"the", "and", "is", "are", "you", "this", "that", "to", "of", "it", "with", "for", "have", "what", "how"},
+    "fr": {"le", "la", "les", "et", "est", "un", "une", "des", "je", "vous", "pas", "que", "pour", "avec", "ce"},
+    "de": {"der", "die", "das", "und", "ist", "ich", "nicht", "ein", "eine", "sie", "mit", "wir", "zu", "auf", "es"},
+    "es": {"el", "la", "los", "las", "y", "es", "un", "una", "que", "por", "para", "con", "no", "está", "yo"},
+}
+_MARKERS = {
+    "fr": set("çœàâêëîïôûù"),
+    "de": set("äöüß"),
+    "es": set("ñ¿¡áíóú"),
+}
+
+
+@lru_cache(maxsize=4096)
+def detect_language(text: str) -> Optional[str]:
+    """文字種と頻出語から言語コードを推定（判断できなければNone）"""
+    text = unicodedata.normalize("NFKC", text).lower()
+    if _KANA.search(text):
+        return "ja"
+    if _HANGUL.search(text):
+        return "ko"
+    han = _HAN.findall(text)
+    if han:
+        simplified = sum(1 for c in han if c in _SIMPLIFIED)
+        traditional = sum(1 for c in han if c in _TRADITIONAL)
+        if simplified > traditional:
+            return "zh-CN"
+        if traditional > simplified:
+            return "zh-TW"
+        return None  # 漢字のみでは日本語・中国語を区別できない
+
+    words = _LATIN_WORD.findall(text)
+    if not words:
+        return None
+    scores = {lang: sum(1 for w in words if w in stopwords) for lang, stopwords in _STOPWORDS.items()}
+    for lang, markers in _MARKERS.items():
+        scores[lang] += sum(2 for c in text if c in markers)
+    best = max(scores, key=scores.get)
+    ranked = sorted(scores.values(), reverse=True)
+    if ranked[0] == 0 or ranked[0] == ranked[1]:
+        return None
+    return best
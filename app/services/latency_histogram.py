@@ -0,0 +1,108 @@
+import bisect
+import time
+from array import array
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# バケット境界（秒）。最後のバケットはそれ以上すべて
+BUCKET_BOUNDS = (
+    0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.3, 0.5,
+    0.75, 1.0, 1.5, 2.0, 3.0, 5.0, 8.0, 10.0, 15.0,
+)
+
+
+class RollingHistogram:
+    """固定バケットのレイテンシ分布を1分単位のスロットで保持（直近 slots 分のみ）"""
+
+    __slots__ = ("slot_seconds", "slots", "counts", "slot_ids", "clock")
+
+    def __init__(self, slot_seconds: float = 60, slots: int = 60,
+                 clock: Callable[[], float] = time.monotonic):
+        self.slot_seconds = slot_seconds
+        self.slots = slots
+        self.counts = [array("l", [0] * (len(BUCKET_BOUNDS) + 1)) for _ in range(slots)]
+        self.slot_ids = [-1] * slots  # 各スロットが表す時間区間の番号
+        self.clock = clock
+
+    def record(self, seconds: float):
+        slot_id = int(self.clock() // self.slot_seconds)
+        index = slot_id % self.slots
+        if self.slot_ids[index] != slot_id:
+            # 古い区間のスロットを再利用
+            counts = self.counts[index]
+            for i in range(len(counts)):
+                counts[i] = 0
+            self.slot_ids[index] = slot_id
+        self.counts[index][bisect.bisect_left(BUCKET_BOUNDS, seconds)] += 1
+
+    def add_to(self, totals: List[int], window_seconds: float):
+        """直近 window_seconds 分のバケット件数を totals に加算"""
+        current = int(self.clock() // self.slot_seconds)
+        oldest = current - min(self.slots, max(1, int(window_seconds // self.slot_seconds))) + 1
+        for slot_id, counts in zip(self.slot_ids, self.counts):
+            if oldest <= slot_id <= current:
+                for i, count in enumerate(counts):
+                    totals[i] += count
+
+
+def percentile(totals: List[int], q: float) -> Optional[float]:
+    """バケット件数から分位点を推定（バケット内は線形補間）"""
+    total = sum(totals)
+    if total == 0:
+        return None
+    rank = q * total
+    cumulative = 0
+    for i, count in enumerate(totals):
+        if count and cumulative + count >= rank:
+            lower = BUCKET_BOUNDS[i - 1] if i > 0 else 0.0
+            if i == len(BUCKET_BOUNDS):
+                return lower  # 上限なしのバケットは下限を返す
+            return lower + (BUCKET_BOUNDS[i] - lower) * (rank - cumulative) / count
+        cumulative += count
+    return BUCKET_BOUNDS[-1]
+
+
+class LatencyRecorder:
+    """ラベル（取得元・言語・結果）ごとのレイテンシ分布"""
+
+    WINDOWS = {'5m': 300, '1h': 3600}
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self._histograms: Dict[Tuple[str, str, str], RollingHistogram] = {}
+
+    def record(self, seconds: float, source: str, lang: str, outcome: str):
+        key = (source, lang, outcome)
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            histogram = self._histograms[key] = RollingHistogram(clock=self.clock)
+        histogram.record(seconds)
+
+    def _merge(self, keys: Iterable[Tuple[str, str, str]], window_seconds: float) -> List[int]:
+        totals = [0] * (len(BUCKET_BOUNDS) + 1)
+        for key in keys:
+            self._histograms[key].add_to(totals, window_seconds)
+        return totals
+
+    @staticmethod
+    def _describe(totals: List[int]) -> Dict:
+        return {
+            'count': sum(totals),
+            'p50': percentile(totals, 0.50),
+            'p95': percentile(totals, 0.95),
+            'p99': percentile(totals, 0.99),
+        }
+
+    def summary(self, window: str = '5m') -> Dict:
+        """全体と、取得元・言語・結果ごとの件数と p50/p95/p99（秒）"""
+        window_seconds = self.WINDOWS[window]
+        keys = list(self._histograms)
+        result = {'window': window, 'overall': self._describe(self._merge(keys, window_seconds))}
+        for position, dimension in enumerate(('source', 'lang', 'outcome')):
+            groups: Dict[str, List[Tuple[str, str, str]]] = {}
+            for key in keys:
+                groups.setdefault(key[position], []).append(key)
+            described = {
+                label: self._describe(self._merge(group, window_seconds)) for label, group in groups.items()
+            }
+            result[dimension] = {label: stats for label, stats in described.items() if stats['count']}
+        return result
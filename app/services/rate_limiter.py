@@ -0,0 +1,113 @@
+import time
+from array import array
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+
+class _SlidingCounter:
+    """1つの時間窓を固定数の小区間（リングバッファ）に分けて数えるカウンター"""
+
+    __slots__ = ("span", "bucket_span", "counts", "total", "current")
+
+    def __init__(self, span: float, resolution: int):
+        self.span = span
+        self.bucket_span = span / resolution
+        # 窓の境界をまたぐ小区間も含めるため1区間多く保持する（制限は緩まない側に丸める）
+        self.counts = array("l", [0] * (resolution + 1))
+        self.total = 0
+        self.current = 0
+
+    def advance(self, now: float):
+        """現在時刻まで進め、窓から外れた小区間を差し引く"""
+        bucket = int(now // self.bucket_span)
+        elapsed = bucket - self.current
+        if elapsed <= 0:
+            return
+        size = len(self.counts)
+        if elapsed >= size:
+            for i in range(size):
+                self.counts[i] = 0
+            self.total = 0
+        else:
+            for i in range(self.current + 1, bucket + 1):
+                index = i % size
+                self.total -= self.counts[index]
+                self.counts[index] = 0
+        self.current = bucket
+
+    def add(self, amount: int):
+        self.counts[self.current % len(self.counts)] += amount
+        self.total += amount
+
+
+class RateLimiter:
+    """キーごとの複数時間窓レート制限（判定・記録は一定コスト、無操作のキーは自動で破棄）
+
+    limits は {名前: (回数, 秒数)}。窓は resolution 個の小区間で近似するため、
+    古い記録は最大で「秒数 / resolution」だけ遅れて窓から外れる（制限が緩むことはない）。
+    """
+
+    def __init__(self, limits: Dict[str, Tuple[int, float]], resolution: int = 60,
+                 clock: Callable[[], float] = time.monotonic):
+        self.limits = dict(limits)
+        self.resolution = resolution
+        self.clock = clock
+        self.idle_after = max(span for _, span in self.limits.values())
+        self._entries: "OrderedDict[Hashable, Tuple[float, Dict[str, _SlidingCounter]]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _evict_idle(self, now: float):
+        """全ての窓を過ぎたキーを古い順に破棄"""
+        while self._entries:
+            key, (last_seen, _) = next(iter(self._entries.items()))
+            if now - last_seen < self.idle_after:
+                break
+            del self._entries[key]
+
+    def _counters(self, key: Hashable, now: float, create: bool) -> Optional[Dict[str, _SlidingCounter]]:
+        self._evict_idle(now)
+        entry = self._entries.get(key)
+        if entry is None:
+            if not create:
+                return None
+            counters = {
+                name: _SlidingCounter(span, self.resolution) for name, (_, span) in self.limits.items()
+            }
+        else:
+            counters = entry[1]
+        for counter in counters.values():
+            counter.advance(now)
+        return counters
+
+    def check(self, key: Hashable) -> Optional[str]:
+        """制限を超える窓の名前を返す（問題なければNone）"""
+        counters = self._counters(key, self.clock(), create=False)
+        if counters is None:
+            return None
+        for name, (limit, _) in self.limits.items():
+            if counters[name].total >= limit:
+                return name
+        return None
+
+    def hit(self, key: Hashable, amount: int = 1):
+        """使用を記録"""
+        now = self.clock()
+        counters = self._counters(key, now, create=True)
+        for counter in counters.values():
+            counter.add(amount)
+        self._entries[key] = (now, counters)
+        self._entries.move_to_end(key)
+
+    def try_acquire(self, key: Hashable) -> Optional[str]:
+        """制限内なら記録してNone、超えていれば窓の名前を返す"""
+        exceeded = self.check(key)
+        if exceeded is None:
+            self.hit(key)
+        return exceeded
+
+    def count(self, key: Hashable, name: str) -> int:
+        """指定した窓での現在の使用回数"""
+        counters = self._counters(key, self.clock(), create=False)
+        return counters[name].total if counters else 0
@@ -0,0 +1,143 @@
+import re
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Optional, Set
+
+
+class Recurrence:
+    """繰り返しルールの基底クラス"""
+
+    spec: str = ""
+
+    def next_after(self, ts: int) -> int:
+        """ts より後の次回実行時刻（epoch秒）"""
+        raise NotImplementedError
+
+    def next_run(self, last_ts: int, now: int) -> int:
+        """last_ts に実行した回の次で、now より後の実行時刻（停止中・遅延中に過ぎた回は飛ばす）"""
+        return self.next_after(max(now, last_ts))
+
+    def describe(self) -> str:
+        """表示用の説明"""
+        raise NotImplementedError
+
+
+class IntervalRecurrence(Recurrence):
+    """一定間隔で繰り返す"""
+
+    def __init__(self, seconds: int):
+        self.seconds = seconds
+        self.spec = f"every:{seconds}"
+
+    def next_after(self, ts: int) -> int:
+        return ts + self.seconds
+
+    def next_run(self, last_ts: int, now: int) -> int:
+        # 配信が遅れても元の時刻から間隔単位で進め、以降の回がずれないようにする
+        if now < last_ts:
+            return last_ts + self.seconds
+        return last_ts + ((now - last_ts) // self.seconds + 1) * self.seconds
+
+    def describe(self) -> str:
+        seconds = self.seconds
+        for unit, label in ((86400, "日"), (3600, "時間"), (60, "分")):
+            if seconds % unit == 0:
+                return f"{seconds // unit}{label}ごと"
+        return f"{seconds}秒ごと"
+
+
+class CronRecurrence(Recurrence):
+    """cron形式（分 時 日 月 曜日）で繰り返す"""
+
+    FIELD_RANGES = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+    def __init__(self, expression: str):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError("cron式は「分 時 日 月 曜日」の5項目で指定してください")
+        self.expression = " ".join(fields)
+        self.spec = f"cron:{self.expression}"
+        sets = [_parse_cron_field(f, lo, hi) for f, (lo, hi) in zip(fields, self.FIELD_RANGES)]
+        self.minutes, self.hours, self.days, self.months, weekdays = sets
+        # cronの曜日は 0=日曜（7も日曜）、datetime.weekday() は 0=月曜
+        self.weekdays = {(d - 1) % 7 for d in weekdays}
+        self.days_restricted = fields[2] != "*"
+        self.weekdays_restricted = fields[4] != "*"
+        self.sorted_hours = sorted(self.hours)
+        self.sorted_minutes = sorted(self.minutes)
+
+    def _day_matches(self, day: datetime) -> bool:
+        if day.month not in self.months:
+            return False
+        dom = day.day in self.days
+        dow = day.weekday() in self.weekdays
+        # 日と曜日の両方が指定された場合はどちらかに一致すればよい（cronと同じ）
+        if self.days_restricted and self.weekdays_restricted:
+            return dom or dow
+        return dom and dow
+
+    def next_after(self, ts: int) -> int:
+        start = datetime.fromtimestamp(ts).replace(second=0, microsecond=0) + timedelta(minutes=1)
+        day = start.replace(hour=0, minute=0)
+        for _ in range(366 * 5):
+            if self._day_matches(day):
+                for hour in self.sorted_hours:
+                    for minute in self.sorted_minutes:
+                        candidate = day.replace(hour=hour, minute=minute)
+                        if candidate >= start:
+                            return int(candidate.timestamp())
+            day += timedelta(days=1)
+        raise ValueError("次回の実行時刻が見つかりません")
+
+    def describe(self) -> str:
+        return f"cron `{self.expression}`"
+
+
+def _parse_cron_field(field: str, lo: int, hi: int) -> Set[int]:
+    values = set()
+    for part in field.split(","):
+        step = 1
+        if "/" in part:
+            part, step_str = part.split("/", 1)
+            step = int(step_str)
+            if step <= 0:
+                raise ValueError(f"cronのステップが無効です: {field}")
+        if part == "*":
+            start, end = lo, hi
+        elif "-" in part:
+            start, end = (int(x) for x in part.split("-", 1))
+        else:
+            start = end = int(part)
+        if start < lo or end > hi or start > end:
+            raise ValueError(f"cronの値が範囲外です: {field}")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+_DAILY_PATTERN = re.compile(r"^(毎日|daily|平日|weekdays?)\s*(\d{1,2}):(\d{2})$")
+
+
+@lru_cache(maxsize=1024)
+def parse_recurrence(spec: str) -> Recurrence:
+    """保存形式（every:秒 / cron:式）から繰り返しルールを復元"""
+    kind, _, value = spec.partition(":")
+    if kind == "every":
+        return IntervalRecurrence(int(value))
+    if kind == "cron":
+        return CronRecurrence(value)
+    raise ValueError(f"不明な繰り返し形式です: {spec}")
+
+
+def parse_recurrence_rule(rule: str, interval_seconds: Optional[int] = None) -> Recurrence:
+    """ユーザー入力（1d / 毎日 9:00 / 平日 9:00 / cron式）から繰り返しルールを作成"""
+    rule = rule.strip().lower()
+    match = _DAILY_PATTERN.match(rule)
+    if match:
+        kind, hour, minute = match.groups()
+        weekdays = "1-5" if kind in ("平日", "weekday", "weekdays") else "*"
+        return CronRecurrence(f"{int(minute)} {int(hour)} * * {weekdays}")
+    if len(rule.split()) == 5:
+        return CronRecurrence(rule)
+    if interval_seconds:
+        return IntervalRecurrence(interval_seconds)
+    raise ValueError("繰り返しルールが無効です")
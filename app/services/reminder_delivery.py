@@ -0,0 +1,176 @@
+import asyncio
+import time
+from collections import OrderedDict, deque
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Set, Tuple
+from app.services.reminder_model import Reminder
+
+
+class ReminderDelivery:
+    """期限を迎えたリマインダーをチャンネルごとの配信キューで並行配信
+
+    チャンネルごとに1つのワーカーが順番に送信する。送信済みの分は全チャンネル共通のバッファに集め、
+    全キューが空になった時点か、最初の1件から flush_delay 秒後に on_done でまとめて通知する。
+    投入側は送信完了を待たないため、混雑したチャンネルが他のチャンネルを遅らせない。
+    """
+
+    def __init__(self, send: Callable[[Reminder], Awaitable[bool]],
+                 on_done: Callable[[List[Reminder]], None], max_concurrency: int = 8,
+                 channel_burst: int = 5, channel_rate: float = 1.0, lag_history: int = 1000,
+                 flush_delay: float = 1.0):
+        self.send = send
+        self.on_done = on_done
+        self.max_concurrency = max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._queues: Dict[int, Deque[Reminder]] = {}  # channel_id -> 配信待ち
+        self._workers: Set[asyncio.Task] = set()
+        self.flush_delay = flush_delay
+        self._finished: List[Reminder] = []  # 送信済みで後処理待ち（全チャンネル共通）
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        # Discordのチャンネル単位制限（5メッセージ/5秒）に合わせたトークンバケット
+        self.channel_burst = channel_burst
+        self.channel_rate = channel_rate
+        self._buckets: Dict[int, List[float]] = {}  # channel_id -> [tokens, last_refill]
+        self.lags = deque(maxlen=lag_history)  # 直近の配信遅延（秒）
+        self.stats = {'delivered': 0, 'failed': 0}
+
+    async def acquire_channel(self, channel_id: int):
+        """チャンネルの送信枠が空くまで待機"""
+        while True:
+            now = time.monotonic()
+            tokens, last = self._buckets.get(channel_id, (self.channel_burst, now))
+            tokens = min(self.channel_burst, tokens + (now - last) * self.channel_rate)
+            if tokens >= 1:
+                self._buckets[channel_id] = [tokens - 1, now]
+                return
+            self._buckets[channel_id] = [tokens, now]
+            await asyncio.sleep((1 - tokens) / self.channel_rate)
+
+    def __len__(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    def submit(self, reminders: List[Reminder]):
+        """チャンネルごとの配信キューに追加（送信完了を待たずに戻る）"""
+        for reminder in reminders:
+            queue = self._queues.get(reminder.channel_id)
+            if queue is None:
+                queue = self._queues[reminder.channel_id] = deque()
+                worker = asyncio.create_task(self._run_channel(reminder.channel_id, queue))
+                self._workers.add(worker)
+                worker.add_done_callback(self._workers.discard)
+            queue.append(reminder)
+
+    async def _run_channel(self, channel_id: int, queue: Deque[Reminder]):
+        """チャンネル内は順番に、チャンネル間はセマフォで上限を設けて並行送信"""
+        try:
+            async with self._semaphore:
+                while queue:
+                    reminder = queue.popleft()
+                    await self.acquire_channel(channel_id)
+                    try:
+                        ok = await self.send(reminder)
+                    except Exception as e:
+                        print(f"リマインダー配信エラー: {e}")
+                        ok = False
+                    self._record(reminder, ok)
+                    self._finished.append(reminder)
+                    # 送信が続いている間も、最初の1件から一定時間後にはまとめて後処理する
+                    if self._flush_handle is None:
+                        self._flush_handle = asyncio.get_running_loop().call_later(self.flush_delay, self.flush)
+        finally:
+            self._queues.pop(channel_id, None)
+            self._evict_idle_buckets()
+            # 全チャンネルの配信が終わったら待たずに後処理する
+            if not self._queues:
+                self.flush()
+
+    def flush(self):
+        """送信済みのリマインダーを on_done で一括通知"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._finished:
+            return
+        finished, self._finished = self._finished, []
+        try:
+            self.on_done(finished)
+        except Exception as e:
+            print(f"リマインダー後処理エラー: {e}")
+
+    def close(self):
+        """配信中のワーカーを停止し、送信済みの分を後処理"""
+        for worker in list(self._workers):
+            worker.cancel()
+        self.flush()
+
+    def _record(self, reminder: Reminder, ok: bool):
+        if not ok:
+            self.stats['failed'] += 1
+            return
+        self.stats['delivered'] += 1
+        self.lags.append(max(0.0, time.time() - reminder.target_ts))
+
+    def _evict_idle_buckets(self):
+        """満タンまで回復したチャンネルのバケットは破棄"""
+        now = time.monotonic()
+        full = [cid for cid, (tokens, last) in self._buckets.items()
+                if tokens + (now - last) * self.channel_rate >= self.channel_burst]
+        for cid in full:
+            del self._buckets[cid]
+
+    def get_lag_stats(self) -> Dict[str, float]:
+        """直近の配信遅延の統計（秒）"""
+        if not self.lags:
+            return {'count': 0, 'p50': 0.0, 'p95': 0.0, 'max': 0.0}
+        ordered = sorted(self.lags)
+        count = len(ordered)
+        return {
+            'count': count,
+            'p50': ordered[int(count * 0.50)],
+            'p95': ordered[min(count - 1, int(count * 0.95))],
+            'max': ordered[-1],
+        }
+
+
+class ReminderCatchUp:
+    """停止中に期限を過ぎたリマインダーを、ユーザー・チャンネル単位でまとめて一定レートで配信"""
+
+    def __init__(self, send: Callable[[List[Reminder]], Awaitable[bool]], rate: float = 0.5,
+                 select: Callable[[List[Reminder]], List[Reminder]] = None):
+        self.send = send
+        self.rate = rate  # 1秒あたりの送信メッセージ数
+        # 送信直前に、キュー待ちの間に削除・担当替えされたものを除く
+        self.select = select
+        self._queue: "OrderedDict[Tuple[int, int], List[Reminder]]" = OrderedDict()
+        self._ready = asyncio.Event()
+        self.stats = {'coalesced': 0, 'messages': 0}
+
+    def __len__(self) -> int:
+        return sum(len(items) for items in self._queue.values())
+
+    def add(self, reminders: List[Reminder]):
+        """古い順にキューへ追加（同じユーザー・チャンネルの分は1通にまとめる）"""
+        for reminder in sorted(reminders, key=lambda r: r.target_ts):
+            self._queue.setdefault((reminder.user_id, reminder.channel_id), []).append(reminder)
+        if self._queue:
+            self._ready.set()
+
+    async def next_batch(self) -> List[Reminder]:
+        """次に送るまとまりを取り出す（キューが空なら待機）"""
+        while not self._queue:
+            self._ready.clear()
+            await self._ready.wait()
+        _, batch = self._queue.popitem(last=False)
+        return batch
+
+    async def drain_one(self) -> List[Reminder]:
+        """1通分を送信してレート分待機し、送信を試みたリマインダーを返す"""
+        batch = await self.next_batch()
+        if self.select is not None:
+            batch = self.select(batch)
+            if not batch:
+                return []
+        if await self.send(batch):
+            self.stats['messages'] += 1
+            self.stats['coalesced'] += len(batch)
+        await asyncio.sleep(1 / self.rate)
+        return batch
@@ -0,0 +1,92 @@
+from array import array
+from datetime import datetime
+from typing import Iterable, List, Optional, Union
+
+
+class Reminder:
+    """1件のリマインダー（時刻はepoch秒の整数、スレッドユーザーはint64配列で保持）"""
+
+    __slots__ = (
+        "id", "user_id", "channel_id", "message", "target_ts",
+        "mention_thread_users", "thread_users", "created_ts", "recurrence", "guild_id",
+    )
+
+    def __init__(self, id: str, user_id: int, channel_id: int, message: str,
+                 target_ts: int, mention_thread_users: bool = False,
+                 thread_users: Optional[Iterable[int]] = None, created_ts: Optional[int] = None,
+                 recurrence: Optional[str] = None, guild_id: Optional[int] = None):
+        self.id = id
+        self.user_id = user_id
+        self.channel_id = channel_id
+        self.message = message
+        self.target_ts = target_ts
+        self.mention_thread_users = mention_thread_users
+        self.thread_users = array("q", thread_users or ())
+        self.created_ts = created_ts if created_ts is not None else to_epoch(datetime.now())
+        self.recurrence = recurrence  # 繰り返しルール（every:秒 / cron:式）、単発ならNone
+        self.guild_id = guild_id  # DMの場合はNone
+
+    @property
+    def target_time(self) -> datetime:
+        return datetime.fromtimestamp(self.target_ts)
+
+    @property
+    def created_at(self) -> datetime:
+        return datetime.fromtimestamp(self.created_ts)
+
+    def to_record(self) -> list:
+        """保存用のコンパクトな配列表現"""
+        record = [
+            self.id, self.user_id, self.channel_id, self.message, self.target_ts,
+            int(self.mention_thread_users), self.thread_users.tolist(), self.created_ts,
+        ]
+        # 省略可能な項目は末尾のNoneを省いて保存
+        optional = [self.recurrence, self.guild_id]
+        while optional and optional[-1] is None:
+            optional.pop()
+        return record + optional
+
+    @classmethod
+    def from_record(cls, record: Union[list, dict]) -> "Reminder":
+        """保存データから復元（旧形式のISO文字列dictにも対応）"""
+        if isinstance(record, dict):
+            return cls(
+                id=record["id"],
+                user_id=record["user_id"],
+                channel_id=record["channel_id"],
+                message=record["message"],
+                target_ts=to_epoch(datetime.fromisoformat(record["target_time"])),
+                mention_thread_users=record.get("mention_thread_users", False),
+                thread_users=record.get("thread_users", []),
+                created_ts=to_epoch(datetime.fromisoformat(record["created_at"]))
+                if record.get("created_at") else None,
+                guild_id=record.get("guild_id"),
+            )
+        rid, user_id, channel_id, message, target_ts, mention, thread_users, created_ts = record[:8]
+        recurrence = record[8] if len(record) > 8 else None
+        guild_id = record[9] if len(record) > 9 else None
+        return cls(rid, user_id, channel_id, message, target_ts, bool(mention), thread_users,
+                   created_ts, recurrence, guild_id)
+
+
+def shard_of(guild_id: Optional[int], shard_count: int) -> int:
+    """Discordのシャード計算式に合わせた担当シャード番号（DMはシャード0）"""
+    if not guild_id or shard_count <= 1:
+        return 0
+    return (guild_id >> 22) % shard_count
+
+
+def to_epoch(value: datetime) -> int:
+    """datetimeをepoch秒（四捨五入、ずれは最大0.5秒）に変換"""
+    return round(value.timestamp())
+
+
+def decode_records(records: List[Union[list, dict]]) -> List[Reminder]:
+    """保存データをまとめて復元（壊れたレコードはスキップ）"""
+    reminders = []
+    for record in records:
+        try:
+            reminders.append(Reminder.from_record(record))
+        except (KeyError, ValueError, TypeError) as e:
+            print(f"リマインダー形式エラー: {e}")
+    return reminders
@@ -0,0 +1,90 @@
+import asyncio
+import heapq
+import time
+from typing import Dict, List, Optional, Tuple
+
+
+class ReminderScheduler:
+    """target_time をキーにしたメモリ上のリマインダースケジューラ（最小ヒープ）"""
+
+    def __init__(self):
+        self._heap: List[Tuple[float, str]] = []  # (target_ts, reminder_id)
+        self._entries: Dict[str, float] = {}  # reminder_id -> 現在有効な target_ts
+        self._wakeup = asyncio.Event()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, reminder_id: str) -> bool:
+        return reminder_id in self._entries
+
+    def push(self, reminder_id: str, target_ts: float):
+        """リマインダーを登録（既存IDの場合は時刻を更新）"""
+        head = self.next_time()
+        self._entries[reminder_id] = target_ts
+        heapq.heappush(self._heap, (target_ts, reminder_id))
+        # 先頭が変わった場合のみ待機中のループを起こす
+        if head is None or target_ts < head:
+            self._wakeup.set()
+
+    def discard(self, reminder_id: str):
+        """リマインダーを登録解除（ヒープからは遅延削除）"""
+        target_ts = self._entries.pop(reminder_id, None)
+        if target_ts is None:
+            return
+        if self._heap and self._heap[0] == (target_ts, reminder_id):
+            self._prune()
+            self._wakeup.set()
+        elif len(self._heap) > 2 * len(self._entries) + 64:
+            # 削除済みエントリが溜まりすぎたらヒープを作り直す
+            self._heap = [(ts, rid) for rid, ts in self._entries.items()]
+            heapq.heapify(self._heap)
+
+    def clear(self):
+        """全登録を破棄"""
+        self._heap.clear()
+        self._entries.clear()
+        self._wakeup.set()
+
+    def _prune(self):
+        """ヒープ先頭の無効エントリを取り除く"""
+        heap = self._heap
+        while heap and self._entries.get(heap[0][1]) != heap[0][0]:
+            heapq.heappop(heap)
+
+    def next_time(self) -> Optional[float]:
+        """次に実行されるリマインダーの時刻（epoch秒）"""
+        self._prune()
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: Optional[float] = None) -> List[str]:
+        """期限を迎えたリマインダーIDを時刻順に取り出す"""
+        now = time.time() if now is None else now
+        due = []
+        heap = self._heap
+        while heap:
+            target_ts, reminder_id = heap[0]
+            if self._entries.get(reminder_id) != target_ts:
+                heapq.heappop(heap)
+                continue
+            if target_ts > now:
+                break
+            heapq.heappop(heap)
+            del self._entries[reminder_id]
+            due.append(reminder_id)
+        return due
+
+    async def wait_next(self, max_wait: Optional[float] = None):
+        """次のリマインダー時刻まで、または先頭が変わるまで待機"""
+        self._wakeup.clear()
+        next_ts = self.next_time()
+        timeout = max_wait
+        if next_ts is not None:
+            delay = max(0.0, next_ts - time.time())
+            timeout = delay if timeout is None else min(delay, timeout)
+        if timeout == 0:
+            return
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
@@ -0,0 +1,387 @@
+import json
+import math
+import os
+import sqlite3
+import time
+from typing import Dict, Iterable, List, Set
+from app.services.reminder_model import Reminder, decode_records
+
+
+class ReminderStore:
+    """リマインダー永続化バックエンドの基底クラス"""
+
+    # 複数プロセスでのシャード分担（リース）に対応しているか
+    supports_leases = False
+    # 期限の近いリマインダーだけをインデックスで読み込めるか
+    supports_due_query = False
+
+    def load_all(self) -> List[Reminder]:
+        """保存済みの全リマインダーを読み込み"""
+        raise NotImplementedError
+
+    def put(self, reminder: Reminder):
+        """リマインダーを追加・更新"""
+        raise NotImplementedError
+
+    def delete(self, reminder_ids: Iterable[str]):
+        """リマインダーをまとめて削除"""
+        raise NotImplementedError
+
+    def load_by_user(self, user_id: int) -> List[Reminder]:
+        """指定ユーザーのリマインダーを読み込み"""
+        return [r for r in self.load_all() if r.user_id == user_id]
+
+    def load_due(self, before_ts: float) -> List[Reminder]:
+        """指定時刻までに期限を迎えるリマインダーを時刻順に読み込み"""
+        return sorted((r for r in self.load_all() if r.target_ts <= before_ts), key=lambda r: r.target_ts)
+
+    def close(self):
+        """後処理（必要なバックエンドのみ）"""
+        pass
+
+
+def _write_snapshot(file_path: str, reminders: Iterable[Reminder], indent=None):
+    """一時ファイルに書き出してからアトミックに置き換え"""
+    tmp_path = f"{file_path}.tmp"
+    data = {"version": 2, "reminders": [r.to_record() for r in reminders]}
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=indent, separators=None if indent else (",", ":"))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, file_path)
+
+
+def _read_snapshot(file_path: str) -> List[Reminder]:
+    """スナップショットを読み込み（旧形式のdict配列にも対応）"""
+    if not os.path.exists(file_path):
+        return []
+    with open(file_path, "r", encoding="utf-8") as f:
+        return decode_records(json.load(f).get("reminders", []))
+
+
+class JsonReminderStore(ReminderStore):
+    """従来形式：変更のたびにJSONファイル全体を書き直す"""
+
+    def __init__(self, file_path: str = "data/reminders.json"):
+        self.file_path = file_path
+        self._state: Dict[str, Reminder] = {}
+        os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+
+    def load_all(self) -> List[Reminder]:
+        try:
+            reminders = _read_snapshot(self.file_path)
+        except Exception as e:
+            print(f"リマインダー読み込みエラー: {e}")
+            reminders = []
+        self._state = {r.id: r for r in reminders}
+        return reminders
+
+    def _save(self):
+        try:
+            _write_snapshot(self.file_path, self._state.values(), indent=2)
+        except Exception as e:
+            print(f"リマインダー保存エラー: {e}")
+
+    def put(self, reminder: Reminder):
+        self._state[reminder.id] = reminder
+        self._save()
+
+    def delete(self, reminder_ids: Iterable[str]):
+        removed = [rid for rid in reminder_ids if self._state.pop(rid, None) is not None]
+        if removed:
+            self._save()
+
+
+class JournalReminderStore(ReminderStore):
+    """スナップショット + 追記専用ジャーナル（WAL）で変更をO(1)で記録"""
+
+    def __init__(self, file_path: str = "data/reminders.json",
+                 journal_path: str = None, compact_threshold: int = 1000):
+        self.file_path = file_path
+        self.journal_path = journal_path or f"{os.path.splitext(file_path)[0]}.journal"
+        self.compact_threshold = compact_threshold
+        self._state: Dict[str, Reminder] = {}
+        self._journal = None
+        self._journal_ops = 0
+        os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+
+    def load_all(self) -> List[Reminder]:
+        """スナップショットを読み込み、ジャーナルを再生"""
+        try:
+            self._state = {r.id: r for r in _read_snapshot(self.file_path)}
+        except Exception as e:
+            print(f"リマインダースナップショット読み込みエラー: {e}")
+            self._state = {}
+
+        replayed = 0
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # 書き込み途中でクラッシュした末尾行は捨てる
+                        print("リマインダージャーナルの壊れた行をスキップしました")
+                        break
+                    self._apply(entry)
+                    replayed += 1
+
+        # 再生した内容をスナップショットに畳み込み、空のジャーナルで再開
+        if replayed:
+            print(f"リマインダージャーナルから {replayed} 件の変更を再生しました")
+        self.compact()
+        return list(self._state.values())
+
+    def _apply(self, entry: Dict):
+        if entry.get("op") == "put":
+            # "reminder" は旧形式（dict）のジャーナル行
+            for reminder in decode_records([entry.get("r") or entry.get("reminder")]):
+                self._state[reminder.id] = reminder
+        elif entry.get("op") == "del":
+            for rid in entry["ids"]:
+                self._state.pop(rid, None)
+
+    def _append(self, entry: Dict):
+        if self._journal is None:
+            self._journal = open(self.journal_path, "a", encoding="utf-8")
+        self._journal.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+        self._journal_ops += 1
+        if self._journal_ops >= max(self.compact_threshold, len(self._state)):
+            self.compact()
+
+    def put(self, reminder: Reminder):
+        self._state[reminder.id] = reminder
+        try:
+            self._append({"op": "put", "r": reminder.to_record()})
+        except Exception as e:
+            print(f"リマインダー保存エラー: {e}")
+
+    def delete(self, reminder_ids: Iterable[str]):
+        removed = [rid for rid in reminder_ids if self._state.pop(rid, None) is not None]
+        if not removed:
+            return
+        try:
+            self._append({"op": "del", "ids": removed})
+        except Exception as e:
+            print(f"リマインダー保存エラー: {e}")
+
+    def compact(self):
+        """現在の状態をスナップショットに書き出してジャーナルを切り詰める"""
+        try:
+            _write_snapshot(self.file_path, self._state.values())
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+            # スナップショットの置き換え完了後にジャーナルを空にする
+            self._journal = open(self.journal_path, "w", encoding="utf-8")
+            self._journal_ops = 0
+        except Exception as e:
+            print(f"リマインダーコンパクションエラー: {e}")
+
+    def close(self):
+        if self._journal is not None:
+            self.compact()
+            self._journal.close()
+            self._journal = None
+
+
+class SqliteReminderStore(ReminderStore):
+    """SQLite（WALモード）にリマインダーを保存し、target_time / user_id をインデックス化"""
+
+    supports_leases = True
+    supports_due_query = True
+
+    def __init__(self, db_path: str = "data/reminders.db",
+                 legacy_path: str = "data/reminders.json"):
+        self.db_path = db_path
+        self.legacy_path = legacy_path
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS reminders (
+                id TEXT PRIMARY KEY,
+                user_id INTEGER NOT NULL,
+                channel_id INTEGER NOT NULL,
+                target_ts INTEGER NOT NULL,
+                payload TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_reminders_target_ts ON reminders (target_ts);
+            CREATE INDEX IF NOT EXISTS idx_reminders_user_id ON reminders (user_id);
+            CREATE TABLE IF NOT EXISTS reminder_leases (
+                shard_id INTEGER PRIMARY KEY,
+                owner TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS reminder_owners (
+                owner TEXT PRIMARY KEY,
+                expires_at REAL NOT NULL
+            );
+        """)
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(reminders)")}
+        if "guild_id" not in columns:
+            self.conn.execute("ALTER TABLE reminders ADD COLUMN guild_id INTEGER")
+            self.conn.commit()
+        self._migrate_legacy()
+
+    def _migrate_legacy(self):
+        """初回起動時に既存の data/reminders.json（+ジャーナル）を取り込む"""
+        if not os.path.exists(self.legacy_path):
+            return
+        if self.conn.execute("SELECT 1 FROM reminders LIMIT 1").fetchone():
+            return
+        legacy = JournalReminderStore(self.legacy_path)
+        reminders = legacy.load_all()
+        legacy.close()
+        with self.conn:
+            self.conn.executemany(
+                self.INSERT_SQL,
+                [self._row(r) for r in reminders]
+            )
+        os.replace(self.legacy_path, f"{self.legacy_path}.migrated")
+        if os.path.exists(legacy.journal_path):
+            os.remove(legacy.journal_path)
+        print(f"✅ {len(reminders)} 件のリマインダーをSQLiteに移行しました")
+
+    INSERT_SQL = (
+        "INSERT OR REPLACE INTO reminders (id, user_id, channel_id, target_ts, payload, guild_id) "
+        "VALUES (?, ?, ?, ?, ?, ?)"
+    )
+    # Discordのシャード計算式 (guild_id >> 22) % shard_count（DMはシャード0）
+    SHARD_EXPR = "((COALESCE(guild_id, 0) >> 22) % ?)"
+
+    @staticmethod
+    def _row(reminder: Reminder):
+        return (
+            reminder.id,
+            reminder.user_id,
+            reminder.channel_id,
+            reminder.target_ts,
+            json.dumps(reminder.to_record(), ensure_ascii=False, separators=(",", ":")),
+            reminder.guild_id,
+        )
+
+    def _query(self, sql: str, params=()) -> List[Reminder]:
+        return decode_records([json.loads(row[0]) for row in self.conn.execute(sql, params)])
+
+    def load_all(self) -> List[Reminder]:
+        return self._query("SELECT payload FROM reminders")
+
+    def load_by_user(self, user_id: int) -> List[Reminder]:
+        return self._query(
+            "SELECT payload FROM reminders WHERE user_id = ? ORDER BY target_ts", (user_id,)
+        )
+
+    def load_due(self, before_ts: float) -> List[Reminder]:
+        """指定時刻までに期限を迎えるリマインダーを時刻順に読み込み"""
+        return self._query(
+            "SELECT payload FROM reminders WHERE target_ts <= ? ORDER BY target_ts", (before_ts,)
+        )
+
+    def put(self, reminder: Reminder):
+        try:
+            with self.conn:
+                self.conn.execute(self.INSERT_SQL, self._row(reminder))
+        except Exception as e:
+            print(f"リマインダー保存エラー: {e}")
+
+    def delete(self, reminder_ids: Iterable[str]):
+        try:
+            with self.conn:
+                self.conn.executemany(
+                    "DELETE FROM reminders WHERE id = ?", [(rid,) for rid in reminder_ids]
+                )
+        except Exception as e:
+            print(f"リマインダー削除エラー: {e}")
+
+    def _shard_filter(self, shards: Set[int], shard_count: int):
+        placeholders = ",".join("?" * len(shards))
+        return f"{self.SHARD_EXPR} IN ({placeholders})", (shard_count, *sorted(shards))
+
+    def load_by_shards(self, shards: Set[int], shard_count: int, before_ts: float = None) -> List[Reminder]:
+        """担当シャードのリマインダーを読み込み（before_ts 指定時はその時刻まで）"""
+        if not shards:
+            return []
+        condition, params = self._shard_filter(shards, shard_count)
+        if before_ts is not None:
+            condition = f"target_ts <= ? AND {condition}"
+            params = (before_ts, *params)
+        return self._query(f"SELECT payload FROM reminders WHERE {condition}", params)
+
+    def existing_ids(self, reminder_ids: List[str]) -> Set[str]:
+        """ストアに残っているIDのみを返す（他プロセスでの削除確認用）"""
+        found = set()
+        for i in range(0, len(reminder_ids), 500):
+            chunk = reminder_ids[i:i + 500]
+            placeholders = ",".join("?" * len(chunk))
+            found.update(row[0] for row in self.conn.execute(
+                f"SELECT id FROM reminders WHERE id IN ({placeholders})", chunk
+            ))
+        return found
+
+    def acquire_leases(self, owner: str, shard_count: int, ttl: float) -> Set[int]:
+        """リースを更新し、生存プロセス数に応じた担当分までシャードを確保"""
+        now = time.time()
+        try:
+            self.conn.execute("BEGIN IMMEDIATE")
+            # 生存通知（シャードを持たないプロセスも分担の頭数に含める）
+            self.conn.execute(
+                "INSERT INTO reminder_owners (owner, expires_at) VALUES (?, ?) "
+                "ON CONFLICT(owner) DO UPDATE SET expires_at = excluded.expires_at",
+                (owner, now + ttl)
+            )
+            self.conn.execute("DELETE FROM reminder_owners WHERE expires_at <= ?", (now,))
+            owners = {row[0] for row in self.conn.execute("SELECT owner FROM reminder_owners")}
+            live = {
+                shard_id: lease_owner
+                for shard_id, lease_owner, expires_at in self.conn.execute(
+                    "SELECT shard_id, owner, expires_at FROM reminder_leases WHERE shard_id < ?",
+                    (shard_count,)
+                )
+                if expires_at > now
+            }
+            fair_share = math.ceil(shard_count / len(owners))
+
+            mine = sorted(shard for shard, lease_owner in live.items() if lease_owner == owner)
+            # 他プロセスが増えた場合は担当超過分を手放す
+            released = mine[fair_share:]
+            mine = mine[:fair_share]
+            free = [shard for shard in range(shard_count) if shard not in live]
+            mine += free[:max(0, fair_share - len(mine))]
+
+            self.conn.executemany(
+                "DELETE FROM reminder_leases WHERE shard_id = ? AND owner = ?",
+                [(shard, owner) for shard in released]
+            )
+            self.conn.executemany(
+                "INSERT INTO reminder_leases (shard_id, owner, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(shard_id) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at",
+                [(shard, owner, now + ttl) for shard in mine]
+            )
+            self.conn.commit()
+            return set(mine)
+        except Exception:
+            self.conn.rollback()
+            raise
+
+    def release_leases(self, owner: str):
+        """保持しているリースを全て解放"""
+        with self.conn:
+            self.conn.execute("DELETE FROM reminder_leases WHERE owner = ?", (owner,))
+            self.conn.execute("DELETE FROM reminder_owners WHERE owner = ?", (owner,))
+
+    def close(self):
+        self.conn.close()
+
+
+def create_reminder_store(file_path: str = "data/reminders.json") -> ReminderStore:
+    """環境変数 REMINDER_STORE に応じてバックエンドを選択"""
+    backend = os.getenv("REMINDER_STORE", "journal").lower()
+    if backend == "json":
+        return JsonReminderStore(file_path)
+    if backend == "sqlite":
+        return SqliteReminderStore(os.getenv("REMINDER_DB_PATH", "data/reminders.db"), file_path)
+    return JournalReminderStore(file_path)
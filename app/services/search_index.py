@@ -0,0 +1,67 @@
+import unicodedata
+from typing import Dict, Iterable, List, Set, Tuple
+
+# カタカナ（ァ〜ヶ）をひらがなに揃える
+_KATA_TO_HIRA = {code: code - 0x60 for code in range(ord("ァ"), ord("ヶ") + 1)}
+
+
+def normalize(text: str) -> str:
+    """検索用の正規化（全角・半角の統一、小文字化、カタカナ→ひらがな、空白除去）"""
+    text = unicodedata.normalize("NFKC", text).lower().translate(_KATA_TO_HIRA)
+    return "".join(text.split())
+
+
+def _grams(text: str) -> Set[str]:
+    """1文字と2文字のn-gram"""
+    return set(text) | {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+class SearchIndex:
+    """正規化済みn-gramの転置インデックスによる補完候補検索
+
+    順位は 完全一致 > 前方一致 > 部分一致 > あいまい一致（2-gramの一致率）。
+    """
+
+    FUZZY_THRESHOLD = 0.5
+
+    def __init__(self, names: Iterable[str]):
+        self.names = list(names)
+        self.keys = [normalize(name) for name in self.names]
+        self.postings: Dict[str, Set[int]] = {}
+        for i, key in enumerate(self.keys):
+            for gram in _grams(key):
+                self.postings.setdefault(gram, set()).add(i)
+
+    def search(self, query: str, limit: int = 25) -> List[str]:
+        q = normalize(query)
+        if not q:
+            return self.names[:limit]
+
+        # 候補ごとに一致したn-gramの数を数える
+        candidates: Dict[int, int] = {}
+        if len(q) == 1:
+            candidates = dict.fromkeys(self.postings.get(q, ()), 1)
+            needed = 1
+        else:
+            bigrams = {q[i:i + 2] for i in range(len(q) - 1)}
+            for gram in bigrams:
+                for i in self.postings.get(gram, ()):
+                    candidates[i] = candidates.get(i, 0) + 1
+            needed = len(bigrams)
+
+        ranked: List[Tuple[int, float, int, int]] = []
+        for i, hits in candidates.items():
+            key = self.keys[i]
+            if key == q:
+                rank = 0
+            elif key.startswith(q):
+                rank = 1
+            elif q in key:
+                rank = 2
+            elif hits / needed >= self.FUZZY_THRESHOLD:
+                rank = 3
+            else:
+                continue
+            ranked.append((rank, -hits / needed, len(key), i))
+        ranked.sort()
+        return [self.names[i] for *_, i in ranked[:limit]]
@@ -0,0 +1,109 @@
+import hashlib
+import json
+import os
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.services.search_index import SearchIndex
+
+# 読み込み失敗として扱う例外（ファイルが無い・JSONが壊れている・想定と違う構造）
+DATA_LOAD_ERRORS = (OSError, ValueError, TypeError, AttributeError, KeyError)
+
+
+class SplatoonData:
+    """読み込み済みのブキデータと編成パターン（読み込み後は変更しない）
+
+    ブキはファイル順の番号で管理し、タグ（role:〜 / type:〜）ごとに該当ブキの集合を
+    整数のビット集合として持つ。候補の絞り込みはビット演算だけで行える。
+    """
+
+    def __init__(self, weapons: Dict[str, List[str]], patterns: Dict[str, List[str]]):
+        self.weapons = weapons
+        self.patterns = patterns
+        # データの内容（ファイル順を含む）の指紋。編成結果はこれとシードで決まる
+        self.fingerprint = hashlib.blake2b(
+            json.dumps([weapons, patterns], ensure_ascii=False).encode("utf-8"), digest_size=8
+        ).hexdigest()
+        self.weapon_names = list(weapons.keys())  # 番号 -> ブキ名
+        self.all_bits = (1 << len(self.weapon_names)) - 1
+        self.tag_bits: Dict[str, int] = {}
+        for i, name in enumerate(self.weapon_names):
+            for tag in weapons[name]:
+                self.tag_bits[tag] = self.tag_bits.get(tag, 0) | (1 << i)
+        # 番号 -> 種別タグ（type:〜）
+        self.weapon_types: List[Tuple[str, ...]] = [
+            tuple(tag for tag in weapons[name] if tag.startswith("type:")) for name in self.weapon_names
+        ]
+        self.roles = sorted(tag[len("role:"):] for tag in self.tag_bits if tag.startswith("role:"))
+        # 補完用の検索インデックス
+        self.weapon_index = SearchIndex(self.weapon_names)
+        self.role_index = SearchIndex(self.roles)
+        self.pattern_index = SearchIndex(patterns.keys())
+
+    def query(self, tags: Iterable[str] = (), exclude: int = 0) -> int:
+        """全てのタグを持つブキのビット集合（exclude のブキは除く）"""
+        bits = self.all_bits
+        for tag in tags:
+            bits &= self.tag_bits.get(tag, 0)
+        return bits & ~exclude
+
+    def names(self, bits: int) -> List[str]:
+        """ビット集合に含まれるブキ名（ファイル順）"""
+        result = []
+        while bits:
+            low = bits & -bits
+            result.append(self.weapon_names[low.bit_length() - 1])
+            bits ^= low
+        return result
+
+
+class SplatoonDataRegistry:
+    """ブキデータと編成パターンを一度だけ読み込んで共有し、ファイル更新時に丸ごと差し替える"""
+
+    CHECK_INTERVAL = 5.0  # ファイル更新の確認間隔（秒）
+
+    def __init__(self, weapon_path: str = "data/weapon_to_groups.json",
+                 pattern_path: str = "data/team_patterns.json"):
+        self.weapon_path = weapon_path
+        self.pattern_path = pattern_path
+        self._data: Optional[SplatoonData] = None
+        self._mtimes: Tuple[float, float] = (0.0, 0.0)
+        self._checked_at = 0.0
+
+    def _current_mtimes(self) -> Tuple[float, float]:
+        return (os.stat(self.weapon_path).st_mtime, os.stat(self.pattern_path).st_mtime)
+
+    def _load(self) -> SplatoonData:
+        with open(self.weapon_path, "r", encoding="utf-8") as f:
+            weapons = json.load(f)
+        with open(self.pattern_path, "r", encoding="utf-8") as f:
+            patterns = json.load(f)
+        return SplatoonData(weapons, patterns)
+
+    def reload(self) -> SplatoonData:
+        """ファイルを読み直して差し替え（失敗時は DATA_LOAD_ERRORS の例外を送出し、現在のデータを維持）"""
+        mtimes = self._current_mtimes()
+        data = self._load()
+        # 参照の付け替えのみで切り替えるため、読み込み中のデータが見えることはない
+        self._data = data
+        self._mtimes = mtimes
+        self._checked_at = time.monotonic()
+        return data
+
+    def get(self) -> SplatoonData:
+        """現在のデータを取得（一定間隔でファイルの更新を確認）"""
+        if self._data is None:
+            return self.reload()
+        now = time.monotonic()
+        if now - self._checked_at >= self.CHECK_INTERVAL:
+            self._checked_at = now
+            try:
+                mtimes = self._current_mtimes()
+                if mtimes != self._mtimes:
+                    # 壊れたファイルを何度も読み直さないよう、失敗しても更新時刻は記録する
+                    self._mtimes = mtimes
+                    self.reload()
+                    print("✅ スプラトゥーンのデータを再読み込みしました")
+            except DATA_LOAD_ERRORS as e:
+                print(f"❌ スプラトゥーンのデータ再読み込みに失敗しました（現在のデータを継続使用）: {e}")
+        return self._data
@@ -0,0 +1,168 @@
+import random
+from typing import Dict, List, Optional, Tuple
+
+from app.services.splatoon_data import SplatoonData
+
+# 1チーム分の編成結果: [(ブキ名, ロール名), ...]
+Team = List[Tuple[str, str]]
+
+
+FORMATION_ATTEMPTS = 5
+
+
+class FormationError(Exception):
+    """条件を満たす編成が作れない"""
+    pass
+
+
+class _Slot:
+    """1チームの1枠"""
+
+    __slots__ = ("team", "role", "weapon")
+
+    def __init__(self, team: int, role: str):
+        self.team = team
+        self.role = role
+        self.weapon: Optional[int] = None
+
+
+class _Solver:
+    """ブキの重複なしで、各枠にロールが一致するブキをできるだけ多く割り当てる
+
+    枠とブキの二部マッチング（増加路法）で解き、種別の上限はチームごとに数えて守る。
+    ロールの合うブキが足りない枠は、2段階目で任意のブキを対象に同じ方法で埋める
+    （既にロールが一致している枠は、付け替えてもロールの合うブキのまま）。
+
+    ブキは乱数で並べ替えた順位で扱い、ビット集合を下位から辿るだけでランダムな順に候補を試す。
+    """
+
+    def __init__(self, data: SplatoonData, slots: List[_Slot], team_count: int,
+                 type_cap: Optional[int], rng: random.Random):
+        self.slots = slots
+        self.type_cap = type_cap
+        # 順位 -> ブキ番号
+        self.order = list(range(len(data.weapon_names)))
+        rng.shuffle(self.order)
+        rank_of = [0] * len(self.order)
+        for rank, weapon in enumerate(self.order):
+            rank_of[weapon] = rank
+        self.all_bits = data.all_bits
+        # 使うロールの候補だけを、読み込み時の索引から順位のビット集合に並べ替える
+        self.role_bits: Dict[str, int] = {}
+        for role in {slot.role for slot in slots}:
+            weapons = data.query((role,))
+            bits = 0
+            while weapons:
+                low = weapons & -weapons
+                bits |= 1 << rank_of[low.bit_length() - 1]
+                weapons ^= low
+            self.role_bits[role] = bits
+        self.weapon_types = [data.weapon_types[weapon] for weapon in self.order]
+        self.owner: Dict[int, int] = {}  # 順位 -> 枠番号
+        self.type_counts: List[Dict[str, int]] = [{} for _ in range(team_count)]
+        self._visited = 0  # 増加路の探索で調べたブキ（順位のビット集合）
+
+    def _fits(self, team: int, weapon: int) -> bool:
+        """チームの種別上限を超えずに weapon を入れられるか"""
+        if self.type_cap is None:
+            return True
+        counts = self.type_counts[team]
+        return all(counts.get(tag, 0) < self.type_cap for tag in self.weapon_types[weapon])
+
+    def _assign(self, slot_id: int, weapon: int):
+        slot = self.slots[slot_id]
+        counts = self.type_counts[slot.team]
+        for tag in self.weapon_types[weapon]:
+            counts[tag] = counts.get(tag, 0) + 1
+        slot.weapon = weapon
+        self.owner[weapon] = slot_id
+
+    def _release(self, slot_id: int):
+        slot = self.slots[slot_id]
+        counts = self.type_counts[slot.team]
+        for tag in self.weapon_types[slot.weapon]:
+            counts[tag] -= 1
+        del self.owner[slot.weapon]
+        slot.weapon = None
+
+    def _augment(self, slot_id: int, any_role: bool = False) -> bool:
+        slot = self.slots[slot_id]
+        # any_role はこの枠だけに適用し、付け替えられる側の枠はロールを守る
+        candidates = self.all_bits if any_role else self.role_bits[slot.role]
+        while True:
+            # 再帰の途中で調べ済みになったブキも除くため毎回絞り込む
+            bits = candidates & ~self._visited
+            if not bits:
+                return False
+            low = bits & -bits
+            weapon = low.bit_length() - 1
+            self._visited |= low
+            # 持ち主から外した状態で上限を確認し、仮に割り当ててから持ち主の付け替え先を探す
+            other = self.owner.get(weapon)
+            if other is not None:
+                self._release(other)
+            if self._fits(slot.team, weapon):
+                self._assign(slot_id, weapon)
+                if other is None or self._augment(other):
+                    return True
+                self._release(slot_id)
+            if other is not None:
+                self._assign(other, weapon)
+
+    def solve(self):
+        # ロールが一致するブキの割り当て（枠の並び順が優先順）
+        failed_roles = set()  # 前回の成功以降に割り当てられなかったロール（同じ探索の繰り返しを省く）
+        for slot_id, slot in enumerate(self.slots):
+            if slot.role in failed_roles:
+                continue
+            self._visited = 0
+            if self._augment(slot_id):
+                failed_roles.clear()
+            else:
+                failed_roles.add(slot.role)
+
+        # 割り当てられなかった枠はロールを問わずに埋める
+        for slot_id, slot in enumerate(self.slots):
+            if slot.weapon is not None:
+                continue
+            self._visited = 0
+            if not self._augment(slot_id, any_role=True):
+                raise FormationError("ブキの種別上限を満たす編成が見つかりませんでした")
+
+
+def form_lobbies(data: SplatoonData, structure: List[str], lobby_count: int, rng: random.Random,
+                 unique_across_lobbies: bool = True, type_cap: Optional[int] = None) -> List[Tuple[Team, Team]]:
+    """複数ロビー分のアルファ・ブラボ編成を作成
+
+    structure はチーム内の枠のロール（role:〜）の並び。ブキはロビー内では必ず重複せず、
+    unique_across_lobbies なら全ロビーを通して重複しない。type_cap はチーム内の同じ種別の上限。
+    ロールの合うブキが足りない場合は、各チームの2枠目以降から先に妥協する。
+    """
+    pools = [list(range(lobby_count))] if unique_across_lobbies else [[lobby] for lobby in range(lobby_count)]
+    results: List[Tuple[Team, Team]] = []
+    for lobbies in pools:
+        team_count = len(lobbies) * 2
+        if team_count * len(structure) > len(data.weapon_names):
+            raise FormationError(
+                f"ブキが足りません（必要 {team_count * len(structure)}個 / 登録 {len(data.weapon_names)}個）"
+            )
+        # 全チームの1枠目 → 2枠目 … の順に並べ、不足が一部のチームに偏らないようにする
+        for attempt in range(FORMATION_ATTEMPTS):
+            slots = [_Slot(team, role) for role in structure for team in range(team_count)]
+            solver = _Solver(data, slots, team_count, type_cap, rng)
+            try:
+                solver.solve()
+                break
+            except FormationError:
+                # 探索順を変えて再試行（乱数は続きから使うので結果は再現できる）
+                if attempt == FORMATION_ATTEMPTS - 1:
+                    raise
+
+        teams: List[Team] = [[] for _ in range(team_count)]
+        for position in range(len(structure)):
+            for team in range(team_count):
+                slot = slots[position * team_count + team]
+                weapon = solver.order[slot.weapon]
+                teams[team].append((data.weapon_names[weapon], slot.role.replace("role:", "")))
+        results.extend((teams[i * 2], teams[i * 2 + 1]) for i in range(len(lobbies)))
+    return results
@@ -0,0 +1,39 @@
+from collections import OrderedDict
+from typing import Optional, Set
+
+
+class ThreadParticipantCache:
+    """スレッドごとの発言者IDを保持するLRUキャッシュ"""
+
+    def __init__(self, max_threads: int = 1000):
+        self.max_threads = max_threads
+        self._threads: "OrderedDict[int, Set[int]]" = OrderedDict()
+
+    def __contains__(self, thread_id: int) -> bool:
+        return thread_id in self._threads
+
+    def get(self, thread_id: int) -> Optional[Set[int]]:
+        """キャッシュ済みの参加者を取得（未取得ならNone）"""
+        users = self._threads.get(thread_id)
+        if users is None:
+            return None
+        self._threads.move_to_end(thread_id)
+        return set(users)
+
+    def seed(self, thread_id: int, user_ids: Set[int]):
+        """履歴から取得した参加者でエントリを作成"""
+        self._threads[thread_id] = set(user_ids)
+        self._threads.move_to_end(thread_id)
+        while len(self._threads) > self.max_threads:
+            self._threads.popitem(last=False)
+
+    def add(self, thread_id: int, user_id: int):
+        """新しい発言者を追加（履歴取得済みのスレッドのみ）"""
+        users = self._threads.get(thread_id)
+        if users is not None:
+            users.add(user_id)
+            self._threads.move_to_end(thread_id)
+
+    def evict(self, thread_id: int):
+        """スレッドのエントリを破棄"""
+        self._threads.pop(thread_id, None)
@@ -0,0 +1,124 @@
+import re
+import unicodedata
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+from typing import Optional, Tuple
+
+# 相対時間（1h30m, 5m, 2d, 30分 など）のトークン
+_DURATION_TOKEN = re.compile(r"(\d+)\s*(時間|秒|分|日|s|m|h|d)")
+_DURATION_UNITS = {
+    "s": 1, "秒": 1,
+    "m": 60, "分": 60,
+    "h": 3600, "時間": 3600,
+    "d": 86400, "日": 86400,
+}
+
+# 絶対日付・時刻
+_DATE_YMD = re.compile(r"^(\d{4})[-/](\d{1,2})[-/](\d{1,2})$")
+_DATE_MD = re.compile(r"^(\d{1,2})[-/](\d{1,2})$")
+_DATE_KEYWORDS = {"今日": 0, "today": 0, "明日": 1, "tomorrow": 1, "明後日": 2}
+_CLOCK = re.compile(r"^(\d{1,2})(?::(\d{2}))?(?::(\d{2}))?\s*(am|pm)?$")
+
+
+def _normalize(text: str) -> str:
+    """全角英数字などを正規化して小文字化"""
+    return unicodedata.normalize("NFKC", text).strip().lower()
+
+
+@lru_cache(maxsize=4096)
+def _parse_duration_normalized(text: str) -> Optional[int]:
+    total_seconds = 0
+    for amount, unit in _DURATION_TOKEN.findall(text):
+        total_seconds += int(amount) * _DURATION_UNITS[unit]
+    return total_seconds if total_seconds > 0 else None
+
+
+def parse_duration(text: str) -> Optional[int]:
+    """相対時間文字列を解析して秒数を返す"""
+    return _parse_duration_normalized(_normalize(text))
+
+
+@lru_cache(maxsize=4096)
+def _parse_date_normalized(text: str) -> Optional[Tuple]:
+    """日付を「現在時刻に依存しない形」で解析（結果をキャッシュ可能にする）"""
+    if text in _DATE_KEYWORDS:
+        return ("offset", _DATE_KEYWORDS[text])
+    match = _DATE_YMD.match(text)
+    if match:
+        year, month, day = (int(x) for x in match.groups())
+        try:
+            date(year, month, day)
+        except ValueError:
+            return None
+        return ("ymd", year, month, day)
+    match = _DATE_MD.match(text)
+    if match:
+        month, day = (int(x) for x in match.groups())
+        # 2/29 などは年が決まるまで検証できないため、閏年で妥当性のみ確認
+        try:
+            date(2000, month, day)
+        except ValueError:
+            return None
+        return ("md", month, day)
+    return None
+
+
+@lru_cache(maxsize=4096)
+def _parse_clock_normalized(text: str) -> Optional[time]:
+    match = _CLOCK.match(text)
+    if not match:
+        return None
+    hour_str, minute_str, second_str, meridiem = match.groups()
+    hour = int(hour_str)
+    minute = int(minute_str) if minute_str else 0
+    second = int(second_str) if second_str else 0
+    if meridiem:
+        if not 1 <= hour <= 12:
+            return None
+        hour = hour % 12 + (12 if meridiem == "pm" else 0)
+    elif minute_str is None:
+        # 24時間表記では分の指定を必須とする（例: 14:30）
+        return None
+    try:
+        return time(hour, minute, second)
+    except ValueError:
+        return None
+
+
+def parse_date(text: str, now: Optional[datetime] = None) -> Optional[date]:
+    """日付文字列を解析（今日/明日/明後日, 2024-12-25, 12/25 など）"""
+    parsed = _parse_date_normalized(_normalize(text))
+    if parsed is None:
+        return None
+    now = now or datetime.now()
+    kind = parsed[0]
+    if kind == "offset":
+        return (now + timedelta(days=parsed[1])).date()
+    if kind == "ymd":
+        return date(parsed[1], parsed[2], parsed[3])
+    # 年の指定がない場合は今年、過去なら来年
+    month, day = parsed[1], parsed[2]
+    for year in (now.year, now.year + 1):
+        try:
+            candidate = date(year, month, day)
+        except ValueError:
+            continue
+        if candidate >= now.date():
+            return candidate
+    return None
+
+
+def parse_clock(text: str) -> Optional[time]:
+    """時刻文字列を解析（14:30, 14:30:00, 2:30pm, 2pm）"""
+    return _parse_clock_normalized(_normalize(text))
+
+
+def parse_datetime(date_str: str, time_str: str, now: Optional[datetime] = None) -> Optional[datetime]:
+    """日付と時刻文字列を解析してdatetimeを返す"""
+    target_date = parse_date(date_str, now)
+    if target_date is None:
+        return None
+    target_time = parse_clock(time_str)
+    if target_time is None:
+        return None
+    return datetime.combine(target_date, target_time)
@@ -1,41 +1,93 @@
 import asyncio
+import os
 import time
-from datetime import datetime, timedelta
-from typing import Dict, Optional, Tuple
+from collections import OrderedDict
+from datetime import date
+from typing import Dict, List, Optional, Tuple
 from concurrent.futures import ThreadPoolExecutor
-from deep_translator import GoogleTranslator
+from app.services.language_detector import detect_language
+from app.services.latency_histogram import LatencyRecorder
+from app.services.rate_limiter import RateLimiter
+from app.services.translation_backends import BackendChain, BackendUnavailableError, create_backend_chain
+from app.services.translation_cache import (
+    LRUTranslationCache, SqliteTranslationCache, TieredTranslationCache, TranslationCache
+)
 
 class TranslateService:
-    def __init__(self):
-        self.cache = {}  # 翻訳結果キャッシュ
-        self.user_usage = {}  # ユーザー使用統計
+    # 対応言語
+    LANGUAGES = {
+        'ja': {'name': '日本語', 'flag': '🇯🇵'},
+        'en': {'name': 'English', 'flag': '🇺🇸'},
+        'zh-CN': {'name': '中文（简体）', 'flag': '🇨🇳'},
+        'zh-TW': {'name': '中文（繁體）', 'flag': '🇹🇼'},
+        'ko': {'name': '한국어', 'flag': '🇰🇷'},
+        'fr': {'name': 'Français', 'flag': '🇫🇷'},
+        'de': {'name': 'Deutsch', 'flag': '🇩🇪'},
+        'es': {'name': 'Español', 'flag': '🇪🇸'}
+    }
+
+    def __init__(self, cache: Optional[TranslationCache] = None, backends: Optional[BackendChain] = None):
         self.stats = {
             'total_translations': 0,
             'daily_translations': {},
-            'popular_languages': {},
-            'average_response_time': 0
+            'popular_languages': {}
         }
+        # 処理時間の分布（取得元・言語・結果ごと）
+        self.latency = LatencyRecorder()
         
         # 設定
         self.MAX_TEXT_LENGTH = 300
         self.CACHE_SIZE = 1000
+        self.CACHE_MAX_BYTES = int(os.getenv("TRANSLATE_CACHE_MAX_BYTES", str(1024 * 1024)))
+        self.CACHE_TTL = float(os.getenv("TRANSLATE_CACHE_TTL", "86400"))
+        # 翻訳結果キャッシュ（差し替え可能）
+        if cache is None:
+            cache = self._create_cache()
+        self.cache = cache
+        self.TIMEOUT = 8.0
+        # 翻訳用スレッドプール（サービス全体で共有）
+        self.MAX_WORKERS = int(os.getenv("TRANSLATE_WORKERS", "4"))
+        self.MAX_PENDING = int(os.getenv("TRANSLATE_MAX_PENDING", "32"))
+        # 翻訳バックエンド（優先順、障害時は次へフォールバック）
+        if backends is None:
+            backends = create_backend_chain(
+                os.getenv("TRANSLATE_BACKENDS", "google").split(","), pool_size=self.MAX_WORKERS
+            )
+        self.backends = backends
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending = 0  # 実行中・待機中のジョブ数（タイムアウト後も完了までカウント）
+        self._inflight: Dict[str, asyncio.Future] = {}  # キャッシュキー -> 実行中の翻訳結果
+        # メッセージID -> (本文, 推定した原文の言語)（リアクション翻訳の再取得・再判定を省く）
+        self.MESSAGE_CACHE_SIZE = 1000
+        self._messages: "OrderedDict[int, Tuple[str, Optional[str]]]" = OrderedDict()
         self.RATE_LIMITS = {
             'per_minute': 3,
             'per_hour': 20,
             'per_day': 50
         }
-        
-        # 対応言語
-        self.LANGUAGES = {
-            'ja': {'name': '日本語', 'flag': '🇯🇵'},
-            'en': {'name': 'English', 'flag': '🇺🇸'},
-            'zh-CN': {'name': '中文（简体）', 'flag': '🇨🇳'},
-            'zh-TW': {'name': '中文（繁體）', 'flag': '🇹🇼'},
-            'ko': {'name': '한국어', 'flag': '🇰🇷'},
-            'fr': {'name': 'Français', 'flag': '🇫🇷'},
-            'de': {'name': 'Deutsch', 'flag': '🇩🇪'},
-            'es': {'name': 'Español', 'flag': '🇪🇸'}
-        }
+        # ユーザーごとの使用回数（分・時間・日の窓）
+        self.rate_limiter = RateLimiter({
+            'per_minute': (self.RATE_LIMITS['per_minute'], 60),
+            'per_hour': (self.RATE_LIMITS['per_hour'], 3600),
+            'per_day': (self.RATE_LIMITS['per_day'], 86400),
+        })
+
+    def _create_cache(self) -> TranslationCache:
+        """環境変数 TRANSLATE_CACHE に応じてキャッシュを作成（disk でSQLite永続キャッシュを併用）"""
+        memory = LRUTranslationCache(
+            max_entries=self.CACHE_SIZE, max_bytes=self.CACHE_MAX_BYTES, ttl=self.CACHE_TTL
+        )
+        if os.getenv("TRANSLATE_CACHE", "memory").lower() != "disk":
+            return memory
+        try:
+            disk = SqliteTranslationCache(
+                os.getenv("TRANSLATE_CACHE_PATH", "data/translation_cache.db"),
+                max_bytes=int(os.getenv("TRANSLATE_DISK_CACHE_MAX_BYTES", str(20 * 1024 * 1024)))
+            )
+            return TieredTranslationCache(memory, disk)
+        except Exception as e:
+            print(f"❌ 永続翻訳キャッシュの初期化に失敗しました（メモリのみで動作）: {e}")
+            return memory
 
     def is_valid_language(self, lang_code: str) -> bool:
         """言語コードの有効性をチェック"""
@@ -64,11 +116,12 @@ class TranslateService:
         """言語情報を取得"""
         return self.LANGUAGES.get(lang_code, {})
 
-    def get_language_choices(self) -> list:
-        """Discord app_commands用の言語選択肢を取得"""
+    @classmethod
+    def get_language_choices(cls) -> list:
+        """Discord app_commands用の言語選択肢を取得（サービスを作成せずに利用可能）"""
         from discord import app_commands
         choices = []
-        for code, info in self.LANGUAGES.items():
+        for code, info in cls.LANGUAGES.items():
             # 選択肢の表示名を「国旗 言語名 (コード)」の形式にする
             display_name = f"{info['flag']} {info['name']} ({code})"
             choices.append(app_commands.Choice(name=display_name, value=code))
@@ -76,64 +129,26 @@ class TranslateService:
 
     def check_rate_limit(self, user_id: int) -> Tuple[bool, str]:
         """レート制限をチェック"""
-        now = datetime.now()
-        user_key = str(user_id)
-        
-        if user_key not in self.user_usage:
-            self.user_usage[user_key] = {
-                'minute': [],
-                'hour': [],
-                'day': []
-            }
-        
-        usage = self.user_usage[user_key]
-        
-        # 古い記録を削除
-        usage['minute'] = [t for t in usage['minute'] if now - t < timedelta(minutes=1)]
-        usage['hour'] = [t for t in usage['hour'] if now - t < timedelta(hours=1)]
-        usage['day'] = [t for t in usage['day'] if now - t < timedelta(days=1)]
-        
-        # 制限チェック
-        if len(usage['minute']) >= self.RATE_LIMITS['per_minute']:
+        exceeded = self.rate_limiter.check(user_id)
+        if exceeded == 'per_minute':
             return False, f"1分間の制限に達しました ({self.RATE_LIMITS['per_minute']}回/分)"
-        if len(usage['hour']) >= self.RATE_LIMITS['per_hour']:
+        if exceeded == 'per_hour':
             return False, f"1時間の制限に達しました ({self.RATE_LIMITS['per_hour']}回/時)"
-        if len(usage['day']) >= self.RATE_LIMITS['per_day']:
+        if exceeded == 'per_day':
             return False, f"1日の制限に達しました ({self.RATE_LIMITS['per_day']}回/日)"
         
         return True, ""
 
     def record_usage(self, user_id: int):
         """使用記録を追加"""
-        now = datetime.now()
-        user_key = str(user_id)
-        
-        if user_key not in self.user_usage:
-            self.user_usage[user_key] = {
-                'minute': [],
-                'hour': [],
-                'day': []
-            }
-        
-        usage = self.user_usage[user_key]
-        usage['minute'].append(now)
-        usage['hour'].append(now)
-        usage['day'].append(now)
+        self.rate_limiter.hit(user_id)
 
     def get_user_stats(self, user_id: int) -> Dict[str, int]:
         """ユーザーの使用統計を取得"""
-        user_key = str(user_id)
-        if user_key not in self.user_usage:
-            return {'daily': 0, 'hourly': 0}
-        
-        now = datetime.now()
-        usage = self.user_usage[user_key]
-        
-        # 古い記録を削除してカウント
-        daily_count = len([t for t in usage['day'] if now - t < timedelta(days=1)])
-        hourly_count = len([t for t in usage['hour'] if now - t < timedelta(hours=1)])
-        
-        return {'daily': daily_count, 'hourly': hourly_count}
+        return {
+            'daily': self.rate_limiter.count(user_id, 'per_day'),
+            'hourly': self.rate_limiter.count(user_id, 'per_hour'),
+        }
 
     def get_cache_key(self, text: str, target_lang: str) -> str:
         """キャッシュキーを生成"""
@@ -146,16 +161,21 @@ class TranslateService:
 
     def cache_translation(self, text: str, target_lang: str, result: str):
         """翻訳結果をキャッシュ"""
-        if len(self.cache) >= self.CACHE_SIZE:
-            # 古いキャッシュを削除（簡単なLRU）
-            oldest_key = next(iter(self.cache))
-            del self.cache[oldest_key]
-        
         cache_key = self.get_cache_key(text, target_lang)
-        self.cache[cache_key] = result
+        self.cache.set(cache_key, result)
+
+    def get_cache_stats(self) -> Dict:
+        """キャッシュの統計（ヒット・ミス・追い出し件数、命中率）"""
+        return self.cache.get_stats()
 
     async def translate_text(self, text: str, target_lang: str, user_id: int) -> Dict:
         """テキストを翻訳"""
+        start = time.monotonic()
+        result = await self._translate_text(text, target_lang, user_id)
+        self._record_translation(self._normalize_language_code(target_lang), time.monotonic() - start, result)
+        return result
+
+    async def _translate_text(self, text: str, target_lang: str, user_id: int) -> Dict:
         start_time = time.time()
         
         # 言語コードを正規化
@@ -199,24 +219,26 @@ class TranslateService:
                 'process_time': time.time() - start_time
             }
         
+        # 同じ内容の翻訳が実行中なら、その結果を共有する（上流へのリクエストは1回）
+        shared = self._inflight.get(self.get_cache_key(text, normalized_lang))
+        
+        # 混雑時は待たせずに断る（バックプレッシャー）
+        if shared is None and self._pending >= self.MAX_PENDING:
+            return {
+                'success': False,
+                'error': '🚦 翻訳リクエストが混み合っています。少し待ってから再試行してください',
+                'error_type': 'busy'
+            }
+        
+        # 全バックエンドが停止中ならタイムアウトを待たずに失敗させる
+        if shared is None and not self.backends.is_available():
+            return self._unavailable_error()
+        
         try:
-            # 非同期で翻訳実行
-            loop = asyncio.get_event_loop()
-            with ThreadPoolExecutor() as executor:
-                result = await asyncio.wait_for(
-                    loop.run_in_executor(
-                        executor, 
-                        self._translate_sync, 
-                        text, 
-                        normalized_lang
-                    ),
-                    timeout=8.0
-                )
+            result = await self._join_single_flight(shared, text, normalized_lang)
             
             # 成功時の処理
             self.record_usage(user_id)
-            self.cache_translation(text, normalized_lang, result.text)
-            self._update_stats(normalized_lang, time.time() - start_time)
             
             return {
                 'success': True,
@@ -228,6 +250,8 @@ class TranslateService:
                 'process_time': time.time() - start_time
             }
             
+        except BackendUnavailableError:
+            return self._unavailable_error()
         except asyncio.TimeoutError:
             return {
                 'success': False,
@@ -241,33 +265,285 @@ class TranslateService:
                 'error_type': 'api_error'
             }
 
+    async def _join_single_flight(self, shared: Optional[asyncio.Future], text: str, target_lang: str):
+        """実行中の同じ翻訳があればその結果を待ち、なければ自分で実行する
+
+        先行リクエストの呼び出し元が中断された場合は、待っていた側が代わりに翻訳を実行する。
+        """
+        while shared is not None:
+            try:
+                return await asyncio.shield(shared)
+            except asyncio.CancelledError:
+                # 自分自身が中断された場合はそのまま中断する
+                if not shared.cancelled() or asyncio.current_task().cancelling():
+                    raise
+            shared = self._inflight.get(self.get_cache_key(text, target_lang))
+        return await self._translate_single_flight(text, target_lang)
+
+    async def _translate_single_flight(self, text: str, target_lang: str):
+        """翻訳を実行し、完了まで同じキーの後続リクエストに結果を共有する"""
+        key = self.get_cache_key(text, target_lang)
+        shared = asyncio.get_running_loop().create_future()
+        self._inflight[key] = shared
+        try:
+            # 共有スレッドプールで非同期に翻訳実行
+            result = await self._run_in_executor(self._translate_sync, text, target_lang)
+            if result.cacheable:
+                self.cache_translation(text, target_lang, result.text)
+            shared.set_result(result)
+            return result
+        except Exception as e:
+            shared.set_exception(e)
+            shared.exception()  # 待機者がいなくても未取得の警告を出さない
+            raise
+        finally:
+            if not shared.done():
+                shared.cancel()
+            del self._inflight[key]
+
+    def get_cached_message(self, message_id: int) -> Optional[Tuple[str, Optional[str]]]:
+        """キャッシュ済みのメッセージ本文と原文の言語を取得"""
+        entry = self._messages.get(message_id)
+        if entry is not None:
+            self._messages.move_to_end(message_id)
+        return entry
+
+    def detect_message_language(self, message_id: int, text: str) -> Optional[str]:
+        """メッセージの言語を推定してメッセージIDごとにキャッシュ"""
+        entry = self._messages.get(message_id)
+        if entry is not None and entry[0] == text:
+            self._messages.move_to_end(message_id)
+            return entry[1]
+        source_lang = detect_language(text)
+        self._messages[message_id] = (text, source_lang)
+        self._messages.move_to_end(message_id)
+        while len(self._messages) > self.MESSAGE_CACHE_SIZE:
+            self._messages.popitem(last=False)
+        return source_lang
+
+    async def translate_message(self, message_id: int, text: str, target_lang: str, user_id: int) -> Dict:
+        """Discordメッセージを翻訳（原文が翻訳先と同じ言語なら翻訳しない）"""
+        source_lang = self.detect_message_language(message_id, text)
+        normalized_lang = self._normalize_language_code(target_lang)
+        if source_lang is not None and source_lang == normalized_lang and len(text) <= self.MAX_TEXT_LENGTH:
+            return {
+                'success': True,
+                'original_text': text,
+                'translated_text': text,
+                'target_lang': normalized_lang,
+                'source_lang': source_lang,
+                'cached': False,
+                'skipped': True,
+                'process_time': 0.0
+            }
+        result = await self.translate_text(text, target_lang, user_id)
+        if result['success'] and source_lang is not None:
+            result['source_lang'] = source_lang
+        return result
+
+    async def translate_batch(self, text: str, target_langs: Optional[List[str]], user_id: int) -> Dict:
+        """1つのテキストを複数言語へ一括翻訳（使用回数は1回、言語ごとに並行実行）"""
+        start_time = time.time()
+        
+        if len(text) > self.MAX_TEXT_LENGTH:
+            return {
+                'success': False,
+                'error': f'テキストが長すぎます (最大{self.MAX_TEXT_LENGTH}文字)',
+                'error_type': 'text_too_long'
+            }
+        
+        # 翻訳先（未指定なら全対応言語）
+        langs = []
+        for lang in target_langs or self.LANGUAGES.keys():
+            normalized = self._normalize_language_code(lang)
+            if normalized not in self.LANGUAGES:
+                return {
+                    'success': False,
+                    'error': f'無効な言語コードです。対応言語: {", ".join(self.LANGUAGES.keys())}',
+                    'error_type': 'invalid_language'
+                }
+            if normalized not in langs:
+                langs.append(normalized)
+        
+        can_proceed, limit_message = self.check_rate_limit(user_id)
+        if not can_proceed:
+            return {
+                'success': False,
+                'error': f'🚫 {limit_message}',
+                'error_type': 'rate_limit'
+            }
+        
+        # 上流へ問い合わせる件数分の空きがなければ断る（キャッシュ済み・実行中のものは数えない）
+        cached = {lang: self.get_cached_translation(text, lang) for lang in langs}
+        misses = [
+            lang for lang in langs
+            if not cached[lang] and self.get_cache_key(text, lang) not in self._inflight
+        ]
+        if self._pending + len(misses) > self.MAX_PENDING:
+            return {
+                'success': False,
+                'error': '🚦 翻訳リクエストが混み合っています。少し待ってから再試行してください',
+                'error_type': 'busy'
+            }
+        if misses and not self.backends.is_available():
+            return self._unavailable_error()
+        
+        # Googleの翻訳エンドポイントには一括APIがないため、言語ごとに共有プールで並行実行
+        results = await asyncio.gather(*(self._translate_item(text, lang, cached[lang]) for lang in langs))
+        succeeded = [item for item in results if item['success']]
+        if not succeeded:
+            return {
+                'success': False,
+                'error': results[0]['error'],
+                'error_type': results[0]['error_type']
+            }
+        
+        self.record_usage(user_id)
+        return {
+            'success': True,
+            'original_text': text,
+            'results': results,
+            'source_lang': next((item['source_lang'] for item in succeeded if not item['cached']), 'auto'),
+            'process_time': time.time() - start_time
+        }
+
+    async def _translate_item(self, text: str, target_lang: str, cached_result: Optional[str]) -> Dict:
+        """一括翻訳の1言語分（キャッシュ → 実行中の同一リクエスト → 新規翻訳の順）"""
+        start = time.monotonic()
+        result = await self._translate_one(text, target_lang, cached_result)
+        self._record_translation(target_lang, time.monotonic() - start, result)
+        return result
+
+    async def _translate_one(self, text: str, target_lang: str, cached_result: Optional[str]) -> Dict:
+        if cached_result:
+            return {
+                'success': True,
+                'target_lang': target_lang,
+                'translated_text': cached_result,
+                'source_lang': 'auto',
+                'cached': True
+            }
+        
+        shared = self._inflight.get(self.get_cache_key(text, target_lang))
+        try:
+            result = await self._join_single_flight(shared, text, target_lang)
+            return {
+                'success': True,
+                'target_lang': target_lang,
+                'translated_text': result.text,
+                'source_lang': result.src,
+                'cached': False
+            }
+        except asyncio.TimeoutError:
+            return {
+                'success': False,
+                'target_lang': target_lang,
+                'error': '⏱️ 翻訳処理がタイムアウトしました',
+                'error_type': 'timeout'
+            }
+        except Exception as e:
+            return {
+                'success': False,
+                'target_lang': target_lang,
+                'error': f'🔧 翻訳サービスエラー: {str(e)}',
+                'error_type': 'api_error'
+            }
+
+    def _unavailable_error(self) -> Dict:
+        return {
+            'success': False,
+            'error': '🔧 翻訳サービスが一時的に利用できません。しばらくしてから再試行してください',
+            'error_type': 'unavailable'
+        }
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """スレッドプールを取得（初回利用時に作成）"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.MAX_WORKERS, thread_name_prefix="translate"
+            )
+        return self._executor
+
+    async def _run_in_executor(self, func, *args):
+        """共有スレッドプールで実行し、タイムアウト時はジョブを待たずに切り離す"""
+        future = self._get_executor().submit(func, *args)
+        self._pending += 1
+        loop = asyncio.get_running_loop()
+        # ワーカーが実際に終わった時点で枠を返す
+        future.add_done_callback(lambda _: loop.call_soon_threadsafe(self._release_slot))
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout=self.TIMEOUT)
+        except asyncio.TimeoutError:
+            # 未着手ならキャンセル、実行中なら結果を捨てる
+            future.cancel()
+            raise
+
+    def _release_slot(self):
+        self._pending -= 1
+
+    def close(self):
+        """スレッドプールとHTTPセッションを停止（待機中のジョブは破棄）"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self.backends.close()
+        self.cache.close()
+
     def _translate_sync(self, text: str, target_lang: str):
-        """同期翻訳処理（ThreadPoolExecutor用）"""
-        translator = GoogleTranslator(source='auto', target=target_lang)
-        translated_text = translator.translate(text)
+        """同期翻訳処理（スレッドプール用）"""
+        translated_text, backend = self.backends.translate(text, target_lang)
         
         # googletransと同じ形式のオブジェクトを模擬
         class TranslationResult:
-            def __init__(self, text, src='auto'):
+            def __init__(self, text, src='auto', backend='', cacheable=True):
                 self.text = text
                 self.src = src
+                self.backend = backend
+                self.cacheable = cacheable
         
-        return TranslationResult(translated_text)
+        return TranslationResult(translated_text, backend=backend.name, cacheable=backend.cacheable)
+
+    def get_backend_stats(self) -> list:
+        """翻訳バックエンドごとの状態（サーキットブレーカー・成功/失敗件数）"""
+        return self.backends.get_stats()
 
-    def _update_stats(self, target_lang: str, process_time: float):
-        """統計情報を更新"""
+    def _record_translation(self, target_lang: str, elapsed: float, result: Dict):
+        """処理時間の分布と統計情報を更新"""
+        if result['success']:
+            outcome = 'success'
+            source = 'cache' if result.get('cached') else 'upstream'
+        else:
+            outcome = result['error_type']
+            source = 'upstream' if outcome in ('timeout', 'api_error') else 'rejected'
+        lang = target_lang if target_lang in self.LANGUAGES else 'invalid'
+        self.latency.record(elapsed, source=source, lang=lang, outcome=outcome)
+        if not result['success']:
+            return
+        
         self.stats['total_translations'] += 1
         
-        # 人気言語統計
-        if target_lang not in self.stats['popular_languages']:
-            self.stats['popular_languages'][target_lang] = 0
-        self.stats['popular_languages'][target_lang] += 1
+        # 日別件数（直近30日分のみ保持）
+        daily = self.stats['daily_translations']
+        today = date.today().isoformat()
+        daily[today] = daily.get(today, 0) + 1
+        while len(daily) > 30:
+            del daily[min(daily)]
         
-        # 平均処理時間更新
-        total = self.stats['total_translations']
-        current_avg = self.stats['average_response_time']
-        self.stats['average_response_time'] = (current_avg * (total - 1) + process_time) / total
+        # 人気言語統計
+        if lang not in self.stats['popular_languages']:
+            self.stats['popular_languages'][lang] = 0
+        self.stats['popular_languages'][lang] += 1
+
+    def get_latency_stats(self, window: str = '5m') -> Dict:
+        """直近の処理時間の p50/p95/p99（window: 5m / 1h）"""
+        return self.latency.summary(window)
 
     def get_global_stats(self) -> Dict:
         """グローバル統計を取得"""
-        return self.stats.copy()
\ No newline at end of file
+        stats = self.stats.copy()
+        stats['daily_translations'] = dict(self.stats['daily_translations'])
+        stats['popular_languages'] = dict(self.stats['popular_languages'])
+        stats['latency'] = {window: self.latency.summary(window) for window in self.latency.WINDOWS}
+        stats['cache'] = self.get_cache_stats()
+        stats['backends'] = self.get_backend_stats()
+        return stats
\ No newline at end of file
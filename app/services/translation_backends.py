@@ -0,0 +1,180 @@
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from app.services.google_translate_client import GoogleTranslatorPool
+
+
+class BackendUnavailableError(Exception):
+    """利用できる翻訳バックエンドがない"""
+    pass
+
+
+class TranslationBackend:
+    """翻訳バックエンドの基底クラス（スレッドプールから同期的に呼ばれる）"""
+
+    name = ""
+    cacheable = True  # 結果を翻訳キャッシュに保存してよいか
+
+    def translate(self, text: str, target_lang: str) -> str:
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class GoogleBackend(TranslationBackend):
+    """Google翻訳（共有HTTPセッション経由）"""
+
+    name = "google"
+
+    def __init__(self, pool_size: int = 4, request_timeout: float = 5.0):
+        self.pool_size = pool_size
+        self.request_timeout = request_timeout
+        self._pool: Optional[GoogleTranslatorPool] = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self) -> GoogleTranslatorPool:
+        """接続プールを取得（初回利用時に作成）"""
+        with self._lock:
+            if self._pool is None:
+                self._pool = GoogleTranslatorPool(pool_size=self.pool_size, timeout=self.request_timeout)
+            return self._pool
+
+    def translate(self, text: str, target_lang: str) -> str:
+        return self._get_pool().translate(text, target_lang)
+
+    def close(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.close()
+                self._pool = None
+
+
+class LocalBackend(TranslationBackend):
+    """ネットワークを使わない決定的な代替バックエンド（テスト・ベンチマーク用、結果はキャッシュしない）"""
+
+    name = "local"
+    cacheable = False
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+
+    def translate(self, text: str, target_lang: str) -> str:
+        if self.latency:
+            time.sleep(self.latency)
+        return f"[{target_lang}] {text.strip()}"
+
+
+class CircuitBreaker:
+    """連続失敗でバックエンドを一時停止し、一定時間後に1件だけ試行して復帰を判定"""
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """リクエストを通してよいか"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                return True
+            return False
+
+    def is_available(self) -> bool:
+        """状態を変えずに、リクエストを通せる見込みがあるか"""
+        with self._lock:
+            if self.state == self.OPEN:
+                return time.monotonic() - self.opened_at >= self.reset_timeout
+            return self.state == self.CLOSED
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+
+class BackendChain:
+    """優先順に並べたバックエンドを、健全なものから順に試す"""
+
+    def __init__(self, backends: List[TranslationBackend], failure_threshold: int = 3,
+                 reset_timeout: float = 30.0):
+        self.backends = backends
+        self.breakers = {
+            backend.name: CircuitBreaker(failure_threshold, reset_timeout) for backend in backends
+        }
+        self.health = {
+            backend.name: {'successes': 0, 'failures': 0, 'last_error': None, 'last_latency': None}
+            for backend in backends
+        }
+
+    def is_available(self) -> bool:
+        """いずれかのバックエンドが利用可能か"""
+        return any(breaker.is_available() for breaker in self.breakers.values())
+
+    def translate(self, text: str, target_lang: str) -> Tuple[str, TranslationBackend]:
+        """翻訳結果と実際に使ったバックエンドを返す"""
+        last_error: Optional[Exception] = None
+        for backend in self.backends:
+            breaker = self.breakers[backend.name]
+            if not breaker.allow():
+                continue
+            health = self.health[backend.name]
+            start = time.monotonic()
+            try:
+                translated = backend.translate(text, target_lang)
+            except Exception as e:
+                breaker.record_failure()
+                health['failures'] += 1
+                # 統計は外部にも公開されるため、例外の内容は含めず種類だけを記録する
+                health['last_error'] = type(e).__name__
+                last_error = e
+                print(f"❌ 翻訳バックエンド {backend.name} でエラー: {type(e).__name__}: {e}")
+                continue
+            breaker.record_success()
+            health['successes'] += 1
+            health['last_latency'] = time.monotonic() - start
+            return translated, backend
+        if last_error is not None:
+            raise last_error
+        raise BackendUnavailableError("利用できる翻訳バックエンドがありません")
+
+    def get_stats(self) -> List[Dict]:
+        """バックエンドごとの状態と成功・失敗件数"""
+        return [
+            {'name': backend.name, 'state': self.breakers[backend.name].state, **self.health[backend.name]}
+            for backend in self.backends
+        ]
+
+    def close(self):
+        for backend in self.backends:
+            backend.close()
+
+
+def create_backend_chain(names: List[str], pool_size: int = 4) -> BackendChain:
+    """名前のリスト（例: ["google", "local"]）からフォールバックチェーンを作成"""
+    backends: List[TranslationBackend] = []
+    for name in names:
+        name = name.strip().lower()
+        if name == "google":
+            backends.append(GoogleBackend(pool_size=pool_size))
+        elif name == "local":
+            backends.append(LocalBackend())
+        elif name:
+            print(f"❌ 不明な翻訳バックエンドです: {name}")
+    return BackendChain(backends or [GoogleBackend(pool_size=pool_size)])
@@ -0,0 +1,273 @@
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+
+class TranslationCache:
+    """翻訳キャッシュの基底クラス（バックエンドを差し替え可能にする）"""
+
+    def __init__(self):
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0}
+
+    def get(self, key: str) -> Optional[str]:
+        """キャッシュから取得（なければNone）"""
+        raise NotImplementedError
+
+    def set(self, key: str, value: str):
+        """キャッシュに保存"""
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        return 0
+
+    def get_stats(self) -> Dict:
+        """ヒット・ミス・追い出し件数と命中率"""
+        lookups = self.stats['hits'] + self.stats['misses']
+        return {
+            **self.stats,
+            'entries': len(self),
+            'hit_rate': self.stats['hits'] / lookups if lookups else 0.0,
+        }
+
+    def close(self):
+        """後処理（必要なバックエンドのみ）"""
+        pass
+
+
+class LRUTranslationCache(TranslationCache):
+    """件数・バイト数上限とTTL付きのLRUキャッシュ（取得・保存ともO(1)）"""
+
+    ENTRY_OVERHEAD = 64  # エントリごとの概算オーバーヘッド（バイト）
+
+    def __init__(self, max_entries: int = 1000, max_bytes: int = 1024 * 1024, ttl: float = 86400):
+        super().__init__()
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[str, float, int]]" = OrderedDict()  # key -> (値, 期限, サイズ)
+        self.bytes_used = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _entry_size(self, key: str, value: str) -> int:
+        return len(key.encode("utf-8")) + len(value.encode("utf-8")) + self.ENTRY_OVERHEAD
+
+    def _remove(self, key: str):
+        _, _, size = self._entries.pop(key)
+        self.bytes_used -= size
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats['misses'] += 1
+            return None
+        value, expires_at, _ = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            self.stats['expirations'] += 1
+            self.stats['misses'] += 1
+            return None
+        # 参照されたエントリを最新に移動（LRU）
+        self._entries.move_to_end(key)
+        self.stats['hits'] += 1
+        return value
+
+    def set(self, key: str, value: str):
+        size = self._entry_size(key, value)
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (value, time.monotonic() + self.ttl, size)
+        self.bytes_used += size
+        # 最も古く参照されたものから追い出す
+        while len(self._entries) > self.max_entries or self.bytes_used > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self.stats['evictions'] += 1
+
+    def get_stats(self) -> Dict:
+        return {**super().get_stats(), 'bytes': self.bytes_used}
+
+
+class SqliteTranslationCache(TranslationCache):
+    """data/ 以下のSQLiteに保存する永続キャッシュ（再起動後も有効、容量超過時はLRUで削除）"""
+
+    def __init__(self, db_path: str = "data/translation_cache.db",
+                 max_bytes: int = 20 * 1024 * 1024, ttl: float = 30 * 86400):
+        super().__init__()
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS translations (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0,
+                last_used REAL NOT NULL,
+                expires_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_translations_last_used ON translations (last_used);
+            CREATE INDEX IF NOT EXISTS idx_translations_hits ON translations (hits);
+        """)
+        with self.conn:
+            self.conn.execute("DELETE FROM translations WHERE expires_at <= ?", (time.time(),))
+        self.bytes_used = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM translations").fetchone()[0]
+        self._count = self.conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+
+    def __len__(self) -> int:
+        return self._count
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        row = self.conn.execute(
+            "SELECT value, expires_at FROM translations WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or row[1] <= now:
+            if row is not None:
+                self._delete(key)
+                self.stats['expirations'] += 1
+            self.stats['misses'] += 1
+            return None
+        with self.conn:
+            self.conn.execute(
+                "UPDATE translations SET hits = hits + 1, last_used = ? WHERE key = ?", (now, key)
+            )
+        self.stats['hits'] += 1
+        return row[0]
+
+    def set(self, key: str, value: str):
+        size = len(key.encode("utf-8")) + len(value.encode("utf-8"))
+        now = time.time()
+        with self.conn:
+            old = self.conn.execute("SELECT size FROM translations WHERE key = ?", (key,)).fetchone()
+            self.conn.execute(
+                "INSERT OR REPLACE INTO translations (key, value, size, hits, last_used, expires_at) "
+                "VALUES (?, ?, ?, COALESCE((SELECT hits FROM translations WHERE key = ?), 0), ?, ?)",
+                (key, value, size, key, now, now + self.ttl)
+            )
+        if old is not None:
+            self.bytes_used -= old[0]
+        else:
+            self._count += 1
+        self.bytes_used += size
+        if self.bytes_used > self.max_bytes:
+            self._evict()
+
+    def _delete(self, key: str):
+        with self.conn:
+            row = self.conn.execute("SELECT size FROM translations WHERE key = ?", (key,)).fetchone()
+            self.conn.execute("DELETE FROM translations WHERE key = ?", (key,))
+        if row is not None:
+            self.bytes_used -= row[0]
+            self._count -= 1
+
+    def _evict(self):
+        """容量の9割まで、最も長く使われていないものから削除"""
+        target = self.max_bytes * 0.9
+        with self.conn:
+            for key, size in self.conn.execute(
+                "SELECT key, size FROM translations ORDER BY last_used"
+            ).fetchall():
+                if self.bytes_used <= target:
+                    break
+                self.conn.execute("DELETE FROM translations WHERE key = ?", (key,))
+                self.bytes_used -= size
+                self._count -= 1
+                self.stats['evictions'] += 1
+
+    def touch(self, touches: Dict[str, Tuple[int, float]]):
+        """他の段で参照されたエントリの参照回数と最終利用時刻をまとめて反映（key -> (回数, 時刻)）"""
+        with self.conn:
+            self.conn.executemany(
+                "UPDATE translations SET hits = hits + ?, last_used = MAX(last_used, ?) WHERE key = ?",
+                [(count, last_used, key) for key, (count, last_used) in touches.items()]
+            )
+
+    def hottest(self, limit: int) -> List[Tuple[str, str]]:
+        """よく使われるエントリを取得（ウォームアップ用）"""
+        return self.conn.execute(
+            "SELECT key, value FROM translations WHERE expires_at > ? ORDER BY hits DESC, last_used DESC LIMIT ?",
+            (time.time(), limit)
+        ).fetchall()
+
+    def get_stats(self) -> Dict:
+        return {**super().get_stats(), 'bytes': self.bytes_used}
+
+    def close(self):
+        self.conn.close()
+
+
+class TieredTranslationCache(TranslationCache):
+    """メモリLRU + 永続キャッシュの2段構成（起動時に人気エントリをメモリへ読み込み）
+
+    メモリでのヒットも永続側の参照回数・最終利用時刻に反映する（書き込みはまとめて遅延）。
+    """
+
+    TOUCH_BATCH = 100  # この件数たまったら永続側へ反映
+    TOUCH_INTERVAL = 30.0  # 最後の反映からこの秒数が経っても反映
+
+    def __init__(self, memory: LRUTranslationCache, disk: SqliteTranslationCache, warm_count: int = 500):
+        super().__init__()
+        self.memory = memory
+        self.disk = disk
+        self._touches: Dict[str, Tuple[int, float]] = {}  # key -> (未反映の参照回数, 最終利用時刻)
+        self._flushed_at = time.monotonic()
+        warmed = 0
+        for key, value in self.disk.hottest(min(warm_count, memory.max_entries)):
+            self.memory.set(key, value)
+            warmed += 1
+        if warmed:
+            print(f"✅ 翻訳キャッシュ {warmed} 件をウォームアップしました")
+
+    def __len__(self) -> int:
+        return len(self.memory)
+
+    def get(self, key: str) -> Optional[str]:
+        value = self.memory.get(key)
+        if value is not None:
+            count, _ = self._touches.get(key, (0, 0.0))
+            self._touches[key] = (count + 1, time.time())
+            self._flush_touches()
+        else:
+            value = self.disk.get(key)
+            if value is not None:
+                self.memory.set(key, value)
+        self.stats['hits' if value is not None else 'misses'] += 1
+        return value
+
+    def _flush_touches(self, force: bool = False):
+        """メモリでのヒットを永続側のLRU順・人気順に反映"""
+        if not self._touches:
+            return
+        if not force and len(self._touches) < self.TOUCH_BATCH \
+                and time.monotonic() - self._flushed_at < self.TOUCH_INTERVAL:
+            return
+        touches, self._touches = self._touches, {}
+        self._flushed_at = time.monotonic()
+        try:
+            self.disk.touch(touches)
+        except sqlite3.Error as e:
+            print(f"❌ 永続翻訳キャッシュの更新に失敗しました: {e}")
+
+    def set(self, key: str, value: str):
+        self.memory.set(key, value)
+        self.disk.set(key, value)
+
+    def get_stats(self) -> Dict:
+        stats = super().get_stats()
+        stats['evictions'] = self.memory.stats['evictions']
+        stats['expirations'] = self.memory.stats['expirations']
+        stats['bytes'] = self.memory.bytes_used
+        stats['disk'] = self.disk.get_stats()
+        return stats
+
+    def close(self):
+        self._flush_touches(force=True)
+        self.disk.close()
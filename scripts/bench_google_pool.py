@@ -0,0 +1,83 @@
+"""ローカルのスタブサーバーに対して、Google翻訳クライアントの1リクエストあたりのオーバーヘッドを比較
+
+呼び出しごとに GoogleTranslator を作成する旧方式（毎回新しい接続）と、
+GoogleTranslatorPool（クライアント再利用 + keep-alive の共有セッション）を比較する。
+
+使い方: python scripts/bench_google_pool.py [リクエスト数]
+"""
+import os
+import socket
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from deep_translator import GoogleTranslator  # noqa: E402
+from app.services.google_translate_client import GoogleTranslatorPool  # noqa: E402
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Googleのモバイル版翻訳ページと同じ要素で訳文を返す"""
+    protocol_version = "HTTP/1.1"  # keep-alive を有効にする
+
+    def setup(self):
+        super().setup()
+        # ヘッダーと本文を分けて書き込むため、Nagle + 遅延ACKの待ちが入らないようにする
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query)
+        body = f'<html><body><div class="result-container">[{query["tl"][0]}] {query["q"][0]}</div></body></html>'
+        payload = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+def bench_legacy(base_url: str, count: int) -> float:
+    start = time.perf_counter()
+    for i in range(count):
+        translator = GoogleTranslator(source="auto", target="en")
+        translator._base_url = base_url
+        translator.translate(f"テキスト {i}")
+    return (time.perf_counter() - start) / count
+
+
+def bench_pool(base_url: str, count: int) -> float:
+    pool = GoogleTranslatorPool(pool_size=4, timeout=5.0)
+    pool.get("en")._base_url = base_url
+    start = time.perf_counter()
+    for i in range(count):
+        pool.translate(f"テキスト {i}", "en")
+    elapsed = time.perf_counter() - start
+    pool.close()
+    return elapsed / count
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/m"
+
+    bench_pool(base_url, 20)  # ウォームアップ
+    legacy = bench_legacy(base_url, count)
+    pooled = bench_pool(base_url, count)
+    server.shutdown()
+
+    print(f"{count}リクエスト（1件あたり）")
+    print(f"呼び出しごとに作成（旧）: {legacy * 1000:7.3f} ms")
+    print(f"GoogleTranslatorPool    : {pooled * 1000:7.3f} ms")
+    print(f"削減: {(legacy - pooled) * 1000:.3f} ms/件 ({1 - pooled / legacy:.0%})")
+
+
+if __name__ == "__main__":
+    main()
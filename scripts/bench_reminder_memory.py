@@ -0,0 +1,63 @@
+"""保留中のリマインダー1件あたりのメモリ使用量を、旧形式（dict + ISO文字列）と Reminder で比較
+
+使い方: python scripts/bench_reminder_memory.py [件数]（デフォルト: 1000000）
+"""
+import gc
+import os
+import sys
+import tracemalloc
+import uuid
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.reminder_model import Reminder  # noqa: E402
+
+BASE_TS = 1_800_000_000
+
+
+def legacy_reminder(i: int) -> dict:
+    """旧形式：ISO文字列の時刻とリストのスレッドユーザー"""
+    return {
+        "id": str(uuid.uuid4()),
+        "user_id": 100_000_000_000_000_000 + i,
+        "channel_id": 200_000_000_000_000_000 + i % 100,
+        "message": f"message {i}",
+        "target_time": datetime.fromtimestamp(BASE_TS + i).isoformat(),
+        "mention_thread_users": True,
+        "thread_users": [300_000_000_000_000_000 + i, 300_000_000_000_000_001 + i],
+        "created_at": datetime.fromtimestamp(BASE_TS).isoformat(),
+    }
+
+
+def slotted_reminder(i: int) -> Reminder:
+    return Reminder(
+        str(uuid.uuid4()), 100_000_000_000_000_000 + i, 200_000_000_000_000_000 + i % 100,
+        f"message {i}", BASE_TS + i, True,
+        [300_000_000_000_000_000 + i, 300_000_000_000_000_001 + i], BASE_TS,
+    )
+
+
+def measure(factory, count: int) -> float:
+    """count 件を保持したときの1件あたりのバイト数"""
+    gc.collect()
+    tracemalloc.start()
+    items = [factory(i) for i in range(count)]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del items
+    gc.collect()
+    return current / count
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    legacy = measure(legacy_reminder, count)
+    slotted = measure(slotted_reminder, count)
+    print(f"{count}件")
+    print(f"dict + ISO文字列: {legacy:8.1f} bytes/件")
+    print(f"Reminder       : {slotted:8.1f} bytes/件 ({slotted / legacy:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""リマインダーストアの変更1件あたりのコストを保存件数ごとに計測（コンパクション込みの償却コスト）
+
+JournalReminderStore は変更ごとにジャーナルへ追記し、max(compact_threshold, 件数) 回の変更ごとに
+スナップショット全体を書き直す。追記1件の時間とコンパクション1回の時間を別々に測り、
+コンパクションを変更回数で割り振った償却コストを表示する。コンパクションの周期が短い件数では、
+周期の2倍の変更を実際に流した実測値（close() まで含む）も併せて表示する。
+
+使い方: python scripts/bench_reminder_store.py [件数 ...]
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.reminder_model import Reminder  # noqa: E402
+from app.services.reminder_store import JournalReminderStore, JsonReminderStore  # noqa: E402
+
+DEFAULT_SIZES = (100, 1_000, 10_000, 100_000, 1_000_000)
+JSON_MAX_SIZE = 10_000  # 全体書き換え方式はこれより大きいと計測に時間がかかりすぎる
+FULL_RUN_MAX_PERIOD = 10_000  # コンパクション周期がこれ以下なら周期の2倍の変更を実際に流す
+OPS = 200
+
+
+def make_reminder(i: int) -> Reminder:
+    return Reminder(str(uuid.uuid4()), 1000 + i % 50, 2000 + i % 20, f"message {i}", 1_800_000_000 + i)
+
+
+def seed_store(store_class, size: int, directory: str):
+    """size 件のスナップショットファイルを書き出し、ストアに読み込ませる"""
+    path = os.path.join(directory, f"{store_class.__name__}_{size}.json")
+    for leftover in (path, f"{os.path.splitext(path)[0]}.journal"):
+        if os.path.exists(leftover):
+            os.remove(leftover)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"version": 2, "reminders": [make_reminder(i).to_record() for i in range(size)]}, f)
+    store = store_class(path)
+    store.load_all()
+    return store
+
+
+def mutate(store, size: int, count: int) -> float:
+    """put と delete を交互に count 回行い、経過時間（秒）を返す"""
+    added = [make_reminder(size + i) for i in range(count // 2)]
+    start = time.perf_counter()
+    for reminder in added:
+        store.put(reminder)
+        store.delete([reminder.id])
+    return time.perf_counter() - start
+
+
+def bench_journal(size: int, directory: str):
+    """(追記 ms/件, コンパクション ms/回, 償却 ms/件, 実測 ms/件 または None)"""
+    store = seed_store(JournalReminderStore, size, directory)
+    period = max(store.compact_threshold, size)  # この回数の変更ごとにコンパクション
+    append = mutate(store, size, OPS * 2) / (OPS * 2)  # 周期より少ないため追記のみ
+    start = time.perf_counter()
+    store.compact()
+    compact = time.perf_counter() - start
+    store.close()
+    amortized = append + compact / period
+
+    measured = None
+    if period <= FULL_RUN_MAX_PERIOD:
+        store = seed_store(JournalReminderStore, size, directory)
+        count = period * 2
+        elapsed = mutate(store, size, count)
+        start = time.perf_counter()
+        store.close()
+        measured = (elapsed + time.perf_counter() - start) / count
+    to_ms = 1000
+    return append * to_ms, compact * to_ms, amortized * to_ms, measured * to_ms if measured is not None else None
+
+
+def bench_json(size: int, directory: str) -> float:
+    """全体書き換え方式の1件あたり（ms）。変更ごとに書き直すため、これがそのまま償却コスト"""
+    store = seed_store(JsonReminderStore, size, directory)
+    elapsed = mutate(store, size, OPS * 2)
+    store.close()
+    return elapsed / (OPS * 2) * 1000
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES
+    with tempfile.TemporaryDirectory() as directory:
+        print("journal: 追記 / コンパクション1回 / 償却（追記 + コンパクション÷周期）/ 実測（周期の2倍の変更 + close）")
+        print(f"{'件数':>10} {'追記 ms/件':>11} {'圧縮 ms/回':>11} {'償却 ms/件':>11} {'実測 ms/件':>11} {'json ms/件':>11}")
+        for size in sizes:
+            append, compact, amortized, measured = bench_journal(size, directory)
+            measured_cost = f"{measured:11.3f}" if measured is not None else f"{'-':>11}"
+            json_cost = f"{bench_json(size, directory):11.3f}" if size <= JSON_MAX_SIZE else f"{'-':>11}"
+            print(f"{size:>10} {append:11.3f} {compact:11.1f} {amortized:11.3f} {measured_cost} {json_cost}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""ブキ名の補完1回あたりの処理時間を、旧実装（入力ごとにJSONを読み込み）とレジストリで比較
+
+使い方: python scripts/bench_splatoon_autocomplete.py
+"""
+import json
+import os
+import sys
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from app.services.splatoon_data import SplatoonDataRegistry  # noqa: E402
+
+WEAPON_PATH = os.path.join(ROOT, "data", "weapon_to_groups.json")
+PATTERN_PATH = os.path.join(ROOT, "data", "team_patterns.json")
+QUERIES = ["", "シュー", "ローラー", "すぷら", "ﾁｬｰｼﾞｬｰ"]
+NUMBER = 2000
+
+
+def legacy_autocomplete(current: str):
+    """旧実装の WeaponLookup.weapon_autocomplete（入力のたびにファイルを開いて解析）"""
+    with open(WEAPON_PATH, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    matches = [w for w in data.keys() if current.lower() in w.lower()]
+    return matches[:25]
+
+
+def registry_substring(registry: SplatoonDataRegistry, current: str):
+    """レジストリのデータに旧実装と同じ部分一致を適用（ディスクI/Oの削減分だけを見る）"""
+    matches = [w for w in registry.get().weapon_names if current.lower() in w.lower()]
+    return matches[:25]
+
+
+def registry_autocomplete(registry: SplatoonDataRegistry, current: str):
+    """現在の実装（レジストリ + 検索インデックス）"""
+    return registry.get().weapon_index.search(current)
+
+
+def per_call_us(func) -> float:
+    return timeit.timeit(func, number=NUMBER) / NUMBER * 1e6
+
+
+def main():
+    registry = SplatoonDataRegistry(WEAPON_PATH, PATTERN_PATH)
+    registry.reload()
+    print(f"ブキ {len(registry.get().weapon_names)}個、{NUMBER}回の平均（µs/回）")
+    print(f"{'入力':<12} {'JSON読み込み（旧）':>18} {'レジストリ+部分一致':>18} {'レジストリ+索引':>16}")
+    for query in QUERIES:
+        legacy = per_call_us(lambda: legacy_autocomplete(query))
+        substring = per_call_us(lambda: registry_substring(registry, query))
+        indexed = per_call_us(lambda: registry_autocomplete(registry, query))
+        print(f"{repr(query):<12} {legacy:18.1f} {substring:18.1f} {indexed:16.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""複数ロビー編成（form_lobbies）の処理時間と制約の充足を計測
+
+登録済みの全パターンについて、ロビー数ごとに複数のシードで編成し、1回あたりの処理時間（p50 / 最大）と
+ロールが一致した枠の割合を表示する。全ロビーでのブキ重複なし・チーム内の種別上限も毎回確認する。
+
+使い方: python scripts/bench_team_formation.py [シード数]（デフォルト: 20）
+"""
+import os
+import random
+import sys
+import time
+from collections import Counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from app.services.splatoon_data import SplatoonDataRegistry  # noqa: E402
+from app.services.team_formation import FormationError, form_lobbies  # noqa: E402
+
+LOBBY_COUNTS = (1, 5, 10, 20)
+TYPE_CAP = 2
+DEADLINE = 3.0  # Discordのインタラクション応答期限（秒）
+
+
+def check(data, lobbies) -> int:
+    """制約を確認し、ロールが一致した枠の数を返す"""
+    weapons = [weapon for alpha, bravo in lobbies for team in (alpha, bravo) for weapon, _ in team]
+    assert len(weapons) == len(set(weapons)), "ロビー間でブキが重複しています"
+    matched = 0
+    for alpha, bravo in lobbies:
+        for team in (alpha, bravo):
+            types = Counter(tag for weapon, _ in team for tag in data.weapons[weapon] if tag.startswith("type:"))
+            assert max(types.values()) <= TYPE_CAP, f"種別の上限を超えています: {types}"
+            matched += sum(1 for weapon, role in team if f"role:{role}" in data.weapons[weapon])
+    return matched
+
+
+def main():
+    seeds = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    registry = SplatoonDataRegistry(os.path.join(ROOT, "data", "weapon_to_groups.json"),
+                                    os.path.join(ROOT, "data", "team_patterns.json"))
+    data = registry.reload()
+    print(f"ブキ {len(data.weapon_names)}個、シード {seeds}個、種別上限 {TYPE_CAP}（ms）")
+    print(f"{'パターン':<24} {'ロビー':>6} {'p50':>8} {'最大':>8} {'ロール一致':>10} {'失敗':>4}")
+    worst = 0.0
+    for pattern, structure in data.patterns.items():
+        for count in LOBBY_COUNTS:
+            timings = []
+            matched = slots = failures = 0
+            for seed in range(seeds):
+                start = time.perf_counter()
+                try:
+                    lobbies = form_lobbies(data, structure, count, random.Random(seed), True, TYPE_CAP)
+                except FormationError:
+                    failures += 1
+                    continue
+                timings.append(time.perf_counter() - start)
+                matched += check(data, lobbies)
+                slots += count * 2 * len(structure)
+            if not timings:
+                print(f"{pattern:<24} {count:>6} {'-':>8} {'-':>8} {'-':>10} {failures:>4}")
+                continue
+            timings.sort()
+            worst = max(worst, timings[-1])
+            print(f"{pattern:<24} {count:>6} {timings[len(timings) // 2] * 1000:8.2f} "
+                  f"{timings[-1] * 1000:8.2f} {matched / slots:10.1%} {failures:>4}")
+    print(f"\n最大 {worst * 1000:.2f} ms（応答期限 {DEADLINE:.0f} 秒）")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""リマインダーの時間表現パーサーのマイクロベンチマーク
+
+/remind と /remind_at の説明文にある形式ごとに、旧実装（re.findall 4回 / strptime の総当たり）と
+現在の実装（キャッシュなし・キャッシュあり）の1回あたりの処理時間を比較する。
+
+使い方: python scripts/bench_time_parser.py
+"""
+import os
+import re
+import sys
+import timeit
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services import time_parser  # noqa: E402
+
+DURATIONS = ["5m", "1h30m", "2d", "30分"]
+DATETIMES = [
+    ("2024-12-25", "14:30"),
+    ("12/25", "14:30"),
+    ("明日", "9:00"),
+    ("明日", "2:30pm"),
+]
+NUMBER = 20000
+
+
+def legacy_parse_time(time_str):
+    """旧実装の ReminderCog.parse_time"""
+    time_str = time_str.lower().strip()
+    patterns = {r'(\d+)s': 1, r'(\d+)m': 60, r'(\d+)h': 3600, r'(\d+)d': 86400}
+    total_seconds = 0
+    for pattern, multiplier in patterns.items():
+        for match in re.findall(pattern, time_str):
+            total_seconds += int(match) * multiplier
+    return total_seconds if total_seconds > 0 else None
+
+
+def legacy_parse_datetime(date_str, time_str):
+    """旧実装の ReminderCog.parse_datetime"""
+    try:
+        now = datetime.now()
+        target_date = None
+        date_str = date_str.strip().lower()
+        if date_str in ["今日", "today"]:
+            target_date = now.date()
+        elif date_str in ["明日", "tomorrow"]:
+            target_date = (now + timedelta(days=1)).date()
+        elif date_str in ["明後日"]:
+            target_date = (now + timedelta(days=2)).date()
+        else:
+            for fmt in ["%Y-%m-%d", "%Y/%m/%d", "%m/%d", "%m-%d"]:
+                try:
+                    if fmt in ["%m/%d", "%m-%d"]:
+                        parsed_date = datetime.strptime(
+                            f"{now.year}-{date_str.replace('/', '-')}", "%Y-%m-%d"
+                        ).date()
+                        if parsed_date < now.date():
+                            parsed_date = parsed_date.replace(year=now.year + 1)
+                        target_date = parsed_date
+                    else:
+                        target_date = datetime.strptime(date_str, fmt).date()
+                    break
+                except ValueError:
+                    continue
+        if target_date is None:
+            return None
+        time_str = time_str.strip().lower()
+        target_time = None
+        time_formats = ["%H:%M", "%H:%M:%S", "%I:%M%p", "%I%p"]
+        time_str = time_str.replace("am", "AM").replace("pm", "PM")
+        if not ("AM" in time_str or "PM" in time_str):
+            time_formats = ["%H:%M", "%H:%M:%S"] + time_formats
+        for fmt in time_formats:
+            try:
+                target_time = datetime.strptime(time_str, fmt).time()
+                break
+            except ValueError:
+                continue
+        if target_time is None:
+            return None
+        return datetime.combine(target_date, target_time)
+    except Exception:
+        return None
+
+
+def clear_caches():
+    time_parser._parse_duration_normalized.cache_clear()
+    time_parser._parse_date_normalized.cache_clear()
+    time_parser._parse_clock_normalized.cache_clear()
+
+
+def per_call_us(stmt) -> float:
+    return timeit.timeit(stmt, number=NUMBER) / NUMBER * 1e6
+
+
+def uncached(func, *args):
+    def run():
+        clear_caches()
+        func(*args)
+    return run
+
+
+def main():
+    print(f"{'入力':<22} {'旧実装':>9} {'キャッシュなし':>12} {'キャッシュあり':>12}  (µs/回)")
+    for text in DURATIONS:
+        legacy = per_call_us(lambda: legacy_parse_time(text))
+        cold = per_call_us(uncached(time_parser.parse_duration, text))
+        warm = per_call_us(lambda: time_parser.parse_duration(text))
+        print(f"{text:<22} {legacy:9.2f} {cold:12.2f} {warm:12.2f}")
+    for date_str, time_str in DATETIMES:
+        legacy = per_call_us(lambda: legacy_parse_datetime(date_str, time_str))
+        cold = per_call_us(uncached(time_parser.parse_datetime, date_str, time_str))
+        warm = per_call_us(lambda: time_parser.parse_datetime(date_str, time_str))
+        print(f"{date_str + ' ' + time_str:<22} {legacy:9.2f} {cold:12.2f} {warm:12.2f}")
+
+
+if __name__ == "__main__":
+    main()
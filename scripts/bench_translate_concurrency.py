@@ -0,0 +1,80 @@
+"""同時50件の /translate 相当の呼び出しで、翻訳1件あたりの処理時間の p50/p99 を計測
+
+上流は LocalBackend で一定の遅延を模擬する（ネットワークは使わない）。
+旧実装（呼び出しごとに ThreadPoolExecutor を作成）と共有スレッドプールを比較する。
+
+使い方: python scripts/bench_translate_concurrency.py
+"""
+import asyncio
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.translate_service import TranslateService  # noqa: E402
+from app.services.translation_backends import BackendChain, LocalBackend  # noqa: E402
+from app.services.translation_cache import LRUTranslationCache  # noqa: E402
+
+CONCURRENCY = 50
+LATENCIES = (0.0, 0.2)  # 上流1件あたりの模擬遅延（秒）
+
+
+def quantiles(samples):
+    ordered = sorted(samples)
+    return ordered[len(ordered) // 2], ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+
+
+async def legacy_call(backend: LocalBackend, text: str) -> float:
+    """旧実装：呼び出しごとにスレッドプールを作成し、with を抜けるまでワーカーの終了を待つ"""
+    start = time.perf_counter()
+    loop = asyncio.get_running_loop()
+    with ThreadPoolExecutor() as executor:
+        await asyncio.wait_for(loop.run_in_executor(executor, backend.translate, text, "en"), timeout=8.0)
+    return time.perf_counter() - start
+
+
+async def run_legacy(latency: float):
+    backend = LocalBackend(latency)
+    samples = await asyncio.gather(*(legacy_call(backend, f"text {i}") for i in range(CONCURRENCY)))
+    return list(samples), 0
+
+
+async def run_shared(latency: float, workers: int, max_pending: int):
+    service = TranslateService(cache=LRUTranslationCache(), backends=BackendChain([LocalBackend(latency)]))
+    service.MAX_WORKERS = workers
+    service.MAX_PENDING = max_pending
+
+    async def call(i: int):
+        start = time.perf_counter()
+        result = await service.translate_text(f"text {i}", "en", user_id=i)
+        return time.perf_counter() - start, result.get('error_type')
+
+    results = await asyncio.gather(*(call(i) for i in range(CONCURRENCY)))
+    service.close()
+    samples = [elapsed for elapsed, error in results if error is None]
+    busy = sum(1 for _, error in results if error == 'busy')
+    return samples, busy
+
+
+async def main():
+    print(f"同時 {CONCURRENCY} 件（ms、p50 / p99、busy は混雑で即時に断った件数）")
+    for latency in LATENCIES:
+        print(f"\n上流の遅延 {latency * 1000:.0f}ms:")
+        scenarios = [
+            ("呼び出しごとにプール作成（旧）", run_legacy(latency)),
+            ("共有プール workers=4 pending=32（既定）", run_shared(latency, 4, 32)),
+            ("共有プール workers=16 pending=64", run_shared(latency, 16, 64)),
+            ("共有プール workers=50 pending=64", run_shared(latency, 50, 64)),
+        ]
+        for label, scenario in scenarios:
+            samples, busy = await scenario
+            p50, p99 = quantiles(samples)
+            print(f"  {label:<36} p50 {p50 * 1000:7.1f} / p99 {p99 * 1000:7.1f}  "
+                  f"(成功 {len(samples)}, busy {busy}, 平均 {statistics.mean(samples) * 1000:.1f})")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,102 @@
+"""再起動直後の翻訳キャッシュ命中率を、合成したクエリログの再生で比較
+
+Zipf分布に従う合成クエリログ（よく使われる定型文ほど頻繁に出る）を、再起動前と再起動後に
+それぞれ再生する。ミスした分は翻訳したものとしてキャッシュに保存する。再起動後の命中率を、
+メモリのみ（空から開始）と、永続キャッシュ併用（人気エントリのウォームアップ + ディスク参照）で比較する。
+
+使い方: python scripts/bench_translation_cache_warmup.py [語彙数] [1回分のクエリ数] [Zipf指数]
+"""
+import itertools
+import os
+import random
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.translation_cache import (  # noqa: E402
+    LRUTranslationCache, SqliteTranslationCache, TieredTranslationCache
+)
+
+LANGUAGES = ["en", "ja", "ko", "zh-cn", "es"]
+MEMORY_ENTRIES = 1000  # TranslateService.CACHE_SIZE と同じ
+WINDOWS = (100, 1000)  # 再起動直後の命中率を見るクエリ数
+
+
+def zipf_log(vocabulary: int, length: int, exponent: float, rng: random.Random):
+    """順位 k のクエリが 1/k^exponent に比例して出るログ（キャッシュキーの列）"""
+    keys = [f"phrase {i}:{LANGUAGES[i % len(LANGUAGES)]}" for i in range(vocabulary)]
+    weights = [1 / (rank ** exponent) for rank in range(1, vocabulary + 1)]
+    cumulative = list(itertools.accumulate(weights))
+    return rng.choices(keys, cum_weights=cumulative, k=length)
+
+
+def replay(cache, log):
+    """ログを再生し、クエリごとの結果（"memory" / "disk" / None）を返す。ミスは翻訳したものとして保存"""
+    memory = getattr(cache, "memory", cache)
+    results = []
+    for key in log:
+        memory_hits = memory.stats['hits']
+        value = cache.get(key)
+        if value is None:
+            cache.set(key, f"translated {key}")
+            results.append(None)
+        else:
+            results.append("memory" if memory.stats['hits'] > memory_hits else "disk")
+    return results
+
+
+def memory_cache():
+    return LRUTranslationCache(max_entries=MEMORY_ENTRIES, max_bytes=1024 * 1024)
+
+
+def tiered_cache(db_path: str, warm_count: int):
+    return TieredTranslationCache(memory_cache(), SqliteTranslationCache(db_path), warm_count=warm_count)
+
+
+def rate(results) -> str:
+    """命中率（うちメモリでの命中）"""
+    hits = sum(1 for r in results if r is not None)
+    memory_hits = sum(1 for r in results if r == "memory")
+    return f"{hits / len(results):6.1%} ({memory_hits / len(results):5.1%})"
+
+
+def main():
+    vocabulary = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    length = int(sys.argv[2]) if len(sys.argv) > 2 else 20_000
+    exponent = float(sys.argv[3]) if len(sys.argv) > 3 else 1.0
+    rng = random.Random(0)
+    before = zipf_log(vocabulary, length, exponent, rng)  # 再起動前の稼働分
+    after = zipf_log(vocabulary, length, exponent, rng)   # 再起動後の稼働分（同じ分布の別サンプル）
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        # 再起動しない場合（参考：十分に温まった状態のメモリキャッシュ）
+        cache = memory_cache()
+        replay(cache, before)
+        results.append(("再起動なし（参考）", replay(cache, after)))
+
+        # メモリのみ：再起動で全て失われる
+        cache = memory_cache()
+        replay(cache, before)
+        results.append(("メモリのみ", replay(memory_cache(), after)))
+
+        # 永続キャッシュ併用：ウォームアップなし（ディスク参照のみ）と、人気500件のウォームアップ
+        for label, warm_count in (("永続キャッシュ（ウォームアップなし）", 0), ("永続キャッシュ + ウォームアップ500件", 500)):
+            db_path = os.path.join(directory, f"cache_{warm_count}.db")
+            cache = tiered_cache(db_path, warm_count)
+            replay(cache, before)
+            cache.close()
+            restarted = tiered_cache(db_path, warm_count)
+            results.append((label, replay(restarted, after)))
+            restarted.close()
+
+    print(f"語彙 {vocabulary}件、Zipf指数 {exponent}、再起動前後に各 {length}クエリを再生、メモリ上限 {MEMORY_ENTRIES}件")
+    print("再起動後の命中率（かっこ内はメモリでの命中）")
+    for label, hits in results:
+        windows = " / ".join(f"最初の{w}件 {rate(hits[:w])}" for w in WINDOWS)
+        print(f"  {label}: {windows} / 全体 {rate(hits)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""編成結果のIDと再表示の一貫性を、ランダムな条件で検証
+
+- 同じパターン・条件・シードなら、IDと編成結果が毎回同じになること
+- ストアを開き直しても、IDから取得した記録が保存時と同じであること
+- メモリから再表示された編成は、件数上限による削除で消えないこと
+- データを再読み込みして内容が変わると、同じ条件・シードでも別のIDになり、共有済みのIDは元の編成を再表示すること
+
+使い方: python scripts/check_formation_replay.py [試行回数]（デフォルト: 200）
+"""
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from app.cogs.splatoon import WeaponFormation  # noqa: E402
+from app.services.formation_store import FormationStore  # noqa: E402
+from app.services.splatoon_data import SplatoonDataRegistry  # noqa: E402
+from app.services.team_formation import FormationError  # noqa: E402
+
+
+def random_options(rng: random.Random, patterns):
+    return (
+        rng.choice(sorted(patterns)),
+        rng.randint(1, 20),
+        rng.choice([None, 1, 2, 3, 4]),
+        rng.random() < 0.8,
+        rng.getrandbits(32),
+    )
+
+
+def check_deterministic(cog: WeaponFormation, trials: int, rng: random.Random):
+    """同じ条件・シードで2回編成し、IDと結果が一致することを確認。保存した記録を返す"""
+    records = []
+    for _ in range(trials):
+        options = random_options(rng, cog.registry.get().patterns)
+        try:
+            first = cog._form(*options)
+        except FormationError:
+            # 条件を満たせない場合は、2回目も同じく失敗することを確認
+            try:
+                cog._form(*options)
+            except FormationError:
+                continue
+            raise AssertionError(f"2回目だけ編成できました: {options}")
+        second = cog._form(*options)
+        assert first["id"] == second["id"], options
+        assert first["lobbies"] == second["lobbies"], options
+        records.append(second)  # 同じIDは上書き保存される
+    return records
+
+
+def check_reopen(db_path: str, records):
+    """開き直したストアから取得した記録が、保存時と同じ内容であることを確認"""
+    store = FormationStore(db_path, memory_entries=10)
+    for record in records:
+        stored = store.get(record["id"])
+        assert stored is not None, record["id"]
+        # 保存形式（JSON）を経由した値と比べる
+        assert stored == json.loads(json.dumps(record, ensure_ascii=False)), record["id"]
+    store.close()
+
+
+def check_memory_hit_survives(directory: str):
+    """メモリから再表示した編成が、SQLite側の件数上限による削除で残ることを確認"""
+    # メモリ側は全件が収まる大きさにして、再表示がメモリから返るようにする
+    store = FormationStore(os.path.join(directory, "lru.db"), memory_entries=100, max_entries=20)
+    store.put("hot", {"lobbies": []})
+    time.sleep(0.01)
+    for i in range(15):
+        store.put(f"cold{i}", {"lobbies": []})
+    time.sleep(0.01)
+    assert "hot" in store._memory and store.get("hot") is not None
+    for i in range(15, 30):
+        store.put(f"cold{i}", {"lobbies": []})
+    store.close()
+    reopened = FormationStore(os.path.join(directory, "lru.db"))
+    survived = reopened.get("hot") is not None
+    reopened.close()
+    assert survived, "メモリから再表示した編成が削除されました"
+
+
+def check_reload_keeps_shared_ids(directory: str):
+    """ブキを1つ削除して再読み込みした後も、共有済みのIDが元の編成を返すことを確認"""
+    weapon_path = os.path.join(directory, "weapon_to_groups.json")
+    pattern_path = os.path.join(directory, "team_patterns.json")
+    shutil.copy(os.path.join(ROOT, "data", "weapon_to_groups.json"), weapon_path)
+    shutil.copy(os.path.join(ROOT, "data", "team_patterns.json"), pattern_path)
+    registry = SplatoonDataRegistry(weapon_path, pattern_path)
+    registry.reload()
+    store = FormationStore(os.path.join(directory, "reload.db"))
+    cog = WeaponFormation(None, registry, store)
+    options = ("default", 10, 2, True, 12345)
+    before = cog._form(*options)
+
+    with open(weapon_path, "r", encoding="utf-8") as f:
+        weapons = json.load(f)
+    del weapons[before["lobbies"][0][0][0][0]]  # 編成に使われたブキを1つ削除
+    with open(weapon_path, "w", encoding="utf-8") as f:
+        json.dump(weapons, f, ensure_ascii=False)
+    registry.reload()
+
+    after = cog._form(*options)
+    assert after["id"] != before["id"], "データが変わっても同じIDになりました"
+    replayed = store.get(before["id"])
+    assert replayed is not None and replayed["lobbies"] == before["lobbies"], "共有済みのIDの編成が変わりました"
+    store.close()
+
+
+def main():
+    trials = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    registry = SplatoonDataRegistry(os.path.join(ROOT, "data", "weapon_to_groups.json"),
+                                    os.path.join(ROOT, "data", "team_patterns.json"))
+    registry.reload()
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = os.path.join(directory, "formations.db")
+        store = FormationStore(db_path)
+        cog = WeaponFormation(None, registry, store)
+        records = check_deterministic(cog, trials, random.Random(0))
+        store.close()
+        print(f"同じ条件・シードで同じIDと編成: {len(records)}/{trials}件（残りは条件を満たせず両方とも失敗）")
+        check_reopen(db_path, records)
+        print(f"開き直したストアからの再表示が保存時と一致: {len(records)}件")
+        check_memory_hit_survives(directory)
+        print("メモリから再表示した編成は削除されずに残る")
+        check_reload_keeps_shared_ids(directory)
+        print("データ変更後は別のIDになり、共有済みのIDは元の編成を再表示する")
+    print("✅ OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""複数プロセスで1つのSQLiteを共有したときのリマインダー担当分割と引き継ぎを検証
+
+3プロセスで担当シャードとリマインダーが重複なく全体を覆うこと、1プロセスを強制終了すると
+リースの有効期間内に残りのプロセスが担当分を引き継ぐことを確認する。
+また、配信中（スケジューラから取り出し済みで後処理前）のリマインダーが、担当の変更で
+取り込み直されて二重に配信されないことを確認する。
+
+使い方: python scripts/check_reminder_leases.py
+"""
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.cogs.reminder import ReminderManager  # noqa: E402
+from app.services.reminder_model import Reminder, shard_of  # noqa: E402
+from app.services.reminder_store import SqliteReminderStore  # noqa: E402
+
+SHARD_COUNT = 8
+PROCESSES = 3
+REMINDERS = 400
+
+
+class FastLeaseManager(ReminderManager):
+    """検証用にリース期間と更新間隔を短くしたもの"""
+    LEASE_TTL = 2
+    LEASE_RENEW_INTERVAL = 0.5
+
+
+def open_store(db_path: str) -> SqliteReminderStore:
+    return SqliteReminderStore(db_path, os.path.join(os.path.dirname(db_path), "none.json"))
+
+
+def worker(db_path: str, queue):
+    manager = FastLeaseManager(open_store(db_path), shard_count=SHARD_COUNT)
+    while True:
+        manager.refresh()
+        queue.put((os.getpid(), time.time(), sorted(manager.owned_shards), sorted(manager.reminders)))
+        time.sleep(manager.LEASE_RENEW_INTERVAL)
+
+
+def latest_states(queue, pids, duration: float):
+    """duration 秒間の報告を集め、プロセスごとの最新状態を返す"""
+    states = {}
+    deadline = time.time() + duration
+    while time.time() < deadline:
+        try:
+            pid, _, shards, ids = queue.get(timeout=0.1)
+        except Exception:
+            continue
+        if pid in pids:
+            states[pid] = (set(shards), set(ids))
+    return states
+
+
+def check_partition(states, all_ids) -> bool:
+    shards = [s for s, _ in states.values()]
+    ids = [i for _, i in states.values()]
+    disjoint = sum(map(len, shards)) == len(set().union(*shards)) and sum(map(len, ids)) == len(set().union(*ids))
+    covered = set().union(*shards) == set(range(SHARD_COUNT)) and set().union(*ids) == all_ids
+    for pid, (s, i) in sorted(states.items()):
+        print(f"  pid {pid}: シャード {sorted(s)} / リマインダー {len(i)}件")
+    print(f"  重複なし: {disjoint} / 全体を担当: {covered}")
+    return disjoint and covered
+
+
+def guild_in_shard(shard: int) -> int:
+    return next(g << 22 for g in range(1, 1000) if shard_of(g << 22, 2) == shard)
+
+
+def check_handoff_in_flight(directory: str) -> bool:
+    """配信中に担当シャードが変わっても、同じリマインダーを再び取り出さないことを確認"""
+    db_path = os.path.join(directory, "in_flight.db")
+    now = int(time.time())
+    kept = Reminder(str(uuid.uuid4()), 1, 2, "kept", now - 1, guild_id=guild_in_shard(0))
+    moved = Reminder(str(uuid.uuid4()), 1, 3, "moved", now - 1, guild_id=guild_in_shard(1))
+    first = FastLeaseManager(open_store(db_path), shard_count=2)
+    for reminder in (kept, moved):
+        first.store.put(reminder)
+    first.refresh()
+    in_flight = {r.id for r in first.get_due_reminders()}  # 配信中（後処理前）
+    results = {"取り出し": in_flight == {kept.id, moved.id}}
+
+    # 2つ目のプロセスが加わり、1つ目はシャード1を手放す（シャード0は継続）
+    second = FastLeaseManager(open_store(db_path), shard_count=2)
+    first.refresh()
+    second.refresh()
+    results["担当の分割"] = first.owned_shards == {0} and second.owned_shards == {1}
+    results["継続シャードの配信中を再取り出ししない"] = not first.get_due_reminders() and kept.id not in first.scheduler
+
+    # 2つ目が停止してシャード1が戻っても、配信中のものは取り込み直さない
+    second.close()
+    first.refresh()
+    results["戻ったシャードの配信中を再取り出ししない"] = (
+        first.owned_shards == {0, 1} and not first.get_due_reminders() and moved.id not in first.scheduler
+    )
+
+    # 後処理（削除）で配信中の扱いが外れる
+    first.remove_reminders([kept.id, moved.id])
+    results["後処理で配信中から外れる"] = not first.in_flight and not first.store.existing_ids([kept.id, moved.id])
+    first.close()
+
+    for label, passed in results.items():
+        print(f"  {label}: {passed}")
+    return all(results.values())
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        print("配信中の担当変更:")
+        in_flight_ok = check_handoff_in_flight(directory)
+
+        db_path = os.path.join(directory, "reminders.db")
+        store = open_store(db_path)
+        now = int(time.time())
+        all_ids = set()
+        for i in range(REMINDERS):
+            # 配信はしないため、期限切れにして全件を取り込み対象にする
+            reminder = Reminder(str(uuid.uuid4()), 1, 2, f"m{i}", now - 60, guild_id=(i + 1) << 22)
+            store.put(reminder)
+            all_ids.add(reminder.id)
+        store.close()
+
+        queue = multiprocessing.Queue()
+        processes = [multiprocessing.Process(target=worker, args=(db_path, queue), daemon=True)
+                     for _ in range(PROCESSES)]
+        for process in processes:
+            process.start()
+
+        print(f"{PROCESSES}プロセスで稼働中:")
+        ok = check_partition(latest_states(queue, {p.pid for p in processes}, 3.0), all_ids)
+
+        victim = processes[0]
+        victim.kill()
+        victim.join()
+        killed_at = time.time()
+        print(f"pid {victim.pid} を強制終了")
+        survivors = {p.pid for p in processes[1:]}
+        while True:
+            states = latest_states(queue, survivors, 1.0)
+            if len(states) == len(survivors) and set().union(*(s for s, _ in states.values())) == set(range(SHARD_COUNT)):
+                break
+            if time.time() - killed_at > FastLeaseManager.LEASE_TTL * 5:
+                break
+        print(f"引き継ぎまで {time.time() - killed_at:.1f}秒（リース期間 {FastLeaseManager.LEASE_TTL}秒）:")
+        ok = check_partition(latest_states(queue, survivors, 1.5), all_ids) and ok
+
+        for process in processes[1:]:
+            process.kill()
+        ok = ok and in_flight_ok
+        print("✅ OK" if ok else "❌ NG")
+        sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
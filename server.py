@@ -1,4 +1,5 @@
 import os
+import hmac
 import asyncio
 from datetime import datetime
 from fastapi import FastAPI
@@ -14,6 +15,19 @@ async def health_check():
     print(f"✅ UptimeRobot ping received at {now}")
     return JSONResponse(content={"message": "Bot is running!"})
 
+@app.get("/stats/translate", include_in_schema=False)
+async def translate_stats(token: str = ""):
+    """翻訳機能の統計（STATS_TOKEN 未設定時は無効、?token= が必要）"""
+    expected = os.getenv("STATS_TOKEN")
+    if not expected:
+        return JSONResponse(status_code=404, content={"error": "not found"})
+    if not hmac.compare_digest(token.encode("utf-8"), expected.encode("utf-8")):
+        return JSONResponse(status_code=403, content={"error": "forbidden"})
+    cog = bot.get_cog("TranslateCog")
+    if cog is None:
+        return JSONResponse(status_code=503, content={"error": "translate cog is not loaded"})
+    return JSONResponse(content=cog.translate_service.get_global_stats())
+
 @app.on_event("startup")
 async def on_startup():
     token = os.getenv("DISCORD_TOKEN")